@@ -0,0 +1,166 @@
+"""Admission control: per-client token buckets and load shedding.
+
+Runs as plain ASGI middleware in front of every route.
+
+- Each client (IP, plus the API key when it is the valid one) gets one
+  bucket for reads (GET/HEAD/OPTIONS) and one for writes.  An empty
+  bucket answers 429 with ``Retry-After`` set to when the next token
+  arrives.
+- ``/api/lights/batch`` isn't charged to the write bucket: a slider posts
+  there many times a second and its writes are already coalesced before
+  they reach Homebridge, so a 429 would only drop the final value.
+- When event-loop lag (from ``app.diagnostics``) exceeds SHED_LAG_MS, or
+  more than SHED_MAX_INFLIGHT requests are already being served, new
+  requests get 503 + ``Retry-After`` so the loop has room for the
+  background refresh jobs.
+- ``/healthz`` bypasses both so supervisors always get an answer.
+  Load shedding still applies to ``/api/lights/batch``.
+"""
+from __future__ import annotations
+
+import math
+import time
+
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.diagnostics import monitor
+
+_EXEMPT_PATHS = frozenset({"/healthz"})
+_READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Bounded by the light write coalescer instead of a per-request bucket
+_UNMETERED_PATHS = frozenset({"/api/lights/batch"})
+_MAX_CLIENTS = 1024
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, per_minute: int, burst: int) -> None:
+        self.rate = per_minute / 60.0
+        self.burst = float(max(1, burst))
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Consume a token; return 0 on success, else seconds until one is free."""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        if self.rate <= 0:
+            return 60.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class Admission:
+    """Shared counters and buckets; one instance per process."""
+
+    def __init__(self) -> None:
+        self.inflight = 0
+        self.shed_total = 0
+        self.limited_total = 0
+        # (client, "read"|"write") -> bucket
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+
+    def overloaded(self) -> str | None:
+        if settings.SHED_MAX_INFLIGHT and self.inflight >= settings.SHED_MAX_INFLIGHT:
+            return "too many requests in flight"
+        if settings.SHED_LAG_MS and monitor.current_lag_ms() >= settings.SHED_LAG_MS:
+            return "event loop lagging"
+        return None
+
+    def take(self, scope) -> float:
+        if scope["path"] in _UNMETERED_PATHS:
+            return 0.0
+        if scope["method"] in _READ_METHODS:
+            kind, per_min, burst = "read", settings.RATE_READ_PER_MIN, settings.RATE_READ_BURST
+        else:
+            kind, per_min, burst = "write", settings.RATE_WRITE_PER_MIN, settings.RATE_WRITE_BURST
+        if per_min <= 0:
+            return 0.0
+        key = (_client_id(scope), kind)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_CLIENTS:
+                self._prune()
+            bucket = self._buckets[key] = TokenBucket(per_min, burst)
+        return bucket.take(time.monotonic())
+
+    def _prune(self) -> None:
+        """Forget buckets that have refilled — they carry no state."""
+        now = time.monotonic()
+        for key, b in list(self._buckets.items()):
+            if b.tokens + (now - b.stamp) * b.rate >= b.burst:
+                del self._buckets[key]
+        if len(self._buckets) >= _MAX_CLIENTS:
+            # Still full: drop the least recently used quarter
+            idle = sorted(self._buckets, key=lambda k: self._buckets[k].stamp)
+            for key in idle[: _MAX_CLIENTS // 4]:
+                del self._buckets[key]
+
+    def reset(self) -> None:
+        """Drop all buckets so new rate settings apply to every client."""
+        self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {
+            "inflight": self.inflight,
+            "shed_total": self.shed_total,
+            "rate_limited_total": self.limited_total,
+            "tracked_clients": len(self._buckets),
+        }
+
+
+admission = Admission()
+
+
+class AdmissionMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in _EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        reason = admission.overloaded()
+        if reason:
+            admission.shed_total += 1
+            await _reject(503, f"Server busy ({reason}), retry shortly", 1)(scope, receive, send)
+            return
+
+        wait = admission.take(scope)
+        if wait:
+            admission.limited_total += 1
+            await _reject(429, "Rate limit exceeded", math.ceil(wait))(scope, receive, send)
+            return
+
+        admission.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.inflight -= 1
+
+
+def _client_id(scope) -> str:
+    """Bucket key.  Auth hasn't run yet, so an unchecked X-API-KEY must not
+    pick the bucket — a made-up key per request would get a fresh one."""
+    client = scope.get("client")
+    ident = "ip:" + (client[0] if client else "unknown")
+    if settings.API_KEY:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-api-key":
+                if value.decode("latin-1") == settings.API_KEY:
+                    ident += "+key"
+                break
+    return ident
+
+
+def _reject(status: int, detail: str, retry_after: int) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status,
+        headers={"Retry-After": str(max(1, retry_after))},
+    )
@@ -9,8 +9,10 @@ async def verify_api_key(request: Request) -> None:
     """Dependency that enforces X-API-KEY when SMARTPANEL_API_KEY is set."""
     if not settings.API_KEY:
         return  # auth disabled
-    # Always allow healthz without auth
-    if request.url.path == "/healthz":
+    # Always allow healthz and the dashboard shell/assets without auth;
+    # the index route only inlines data for authorised requests itself
+    path = request.url.path
+    if path in ("/healthz", "/") or path.startswith("/static/"):
         return
     key = request.headers.get("X-API-KEY", "")
     if key != settings.API_KEY:
@@ -5,6 +5,8 @@ from typing import Any
 
 from pydantic import BaseModel
 
+from app.config import settings
+
 
 class CacheEntry(BaseModel):
     """Typed snapshot for a single cache key."""
@@ -37,6 +39,12 @@ class Cache:
             error=None,
         )
 
+    def replace_data(self, key: str, data: Any) -> None:
+        """Swap in *data*, keeping updated_at and error (optimistic patches)."""
+        entry = self._store.get(key)
+        if entry is not None:
+            self._store[key] = entry.model_copy(update={"data": data})
+
     def set_error(self, key: str, error: str) -> None:
         if key in self._store:
             self._store[key].error = error
@@ -55,4 +63,17 @@ class Cache:
         return {k: v.error for k, v in self._store.items()}
 
 
-cache = Cache()
+def _make_cache():
+    """Pick the cache backend configured by CACHE_BACKEND."""
+    if settings.CACHE_BACKEND == "shm":
+        from app.shm_cache import SharedCache
+
+        return SharedCache(
+            settings.SHM_CACHE_PATH,
+            slots=settings.SHM_SLOTS,
+            slot_size=settings.SHM_SLOT_SIZE,
+        )
+    return Cache()
+
+
+cache = _make_cache()
@@ -1,15 +1,54 @@
 from __future__ import annotations
 
+import importlib.util
 import logging
 import os
 import sys
+from typing import Any
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
+
+# Variables set before any env file is applied (shell, systemd Environment=)
+_process_env = frozenset(os.environ)
 
 load_dotenv()
 
 log = logging.getLogger(__name__)
 
+# File re-read on reload.  Set SMARTPANEL_ENV_FILE to the file systemd
+# loads with EnvironmentFile=; its values then win, as they do under
+# systemd.  The default .env only fills in variables the process
+# environment doesn't already set, same as load_dotenv() at startup.
+ENV_FILE: str = os.getenv("SMARTPANEL_ENV_FILE", "")
+# Keys applied from the env file, so removing a line unsets the variable
+_env_file_keys: set[str] = set() if ENV_FILE else set(os.environ) - _process_env
+
+
+def _apply_env_file() -> str | None:
+    """Copy the env file into os.environ; returns an error if unreadable.
+
+    Only called on reload — never at import, so an unreadable file can't
+    stop the service from starting.
+    """
+    global _env_file_keys
+    path = ENV_FILE or ".env"
+    try:
+        with open(path, encoding="utf-8") as f:
+            values = {k: v for k, v in dotenv_values(stream=f).items() if v is not None}
+    except FileNotFoundError:
+        if ENV_FILE:
+            return f"env file {path} not found"
+        values = {}
+    except OSError as e:
+        return f"cannot read env file {path}: {e}"
+    if not ENV_FILE:
+        values = {k: v for k, v in values.items() if k not in _process_env}
+    for key in _env_file_keys - values.keys():
+        os.environ.pop(key, None)
+    os.environ.update(values)
+    _env_file_keys = set(values)
+    return None
+
 
 def _csv_list(key: str) -> list[str]:
     raw = os.getenv(key, "")
@@ -44,6 +83,11 @@ class Settings:
     LIGHT_IDS: list[str] = _csv_list("LIGHT_IDS")
     LIGHT_CONFIG_PATH: str = os.getenv("LIGHT_CONFIG_PATH", "")
 
+    # Slider writes within this window collapse to the latest value per
+    # accessory + characteristic before being sent to Homebridge.
+    LIGHT_BATCH_WINDOW_MS: int = int(os.getenv("LIGHT_BATCH_WINDOW_MS", "150"))
+    LIGHT_BATCH_CONCURRENCY: int = int(os.getenv("LIGHT_BATCH_CONCURRENCY", "4"))
+
     # --- Pi-hole (v5 admin API) ---
     PIHOLE_URL: str = os.getenv("PIHOLE_URL", "http://localhost")
     PIHOLE_API_TOKEN: str = os.getenv("PIHOLE_API_TOKEN", "")
@@ -52,6 +96,10 @@ class Settings:
     ROUTER_IP: str = os.getenv("ROUTER_IP", "192.168.1.1")
     PING_TARGETS: list[str] = _csv_list("PING_TARGETS") or _csv_list("PING_TARGET") or ["1.1.1.1", "8.8.8.8"]
     DNS_TEST_DOMAIN: str = _env("DNS_TEST_DOMAIN", "DNS_CHECK_HOST", default="example.com")
+    DNS_TEST_DOMAINS: list[str] = _csv_list("DNS_TEST_DOMAINS") or [DNS_TEST_DOMAIN]
+    # Resolver IPs to probe directly; empty = Pi-hole, router, first ping target
+    DNS_RESOLVERS: list[str] = _csv_list("DNS_RESOLVERS")
+    DNS_QUERY_TIMEOUT: float = float(os.getenv("DNS_QUERY_TIMEOUT", "1.5"))
 
     # --- Weather (Open-Meteo) ---
     WEATHER_LAT: str = _env("LAT", "WEATHER_LAT", default="0")
@@ -72,6 +120,54 @@ class Settings:
     REFRESH_NETWORK: int = int(os.getenv("REFRESH_NETWORK", "60"))
     REFRESH_WEATHER: int = int(os.getenv("REFRESH_WEATHER", "3600"))
     REFRESH_TODOS: int = int(os.getenv("REFRESH_TODOS", "30"))
+    REFRESH_FITNESS: int = int(os.getenv("REFRESH_FITNESS", "3600"))
+
+    # --- Data sources (see app/sources.py) ---
+    # Keys listed here are never imported, scheduled or routed
+    SOURCES_DISABLED: list[str] = _csv_list("SOURCES_DISABLED")
+
+    # --- Cache backend ---
+    # "memory": in-process cache, refresh loops run inside the API (1 worker).
+    # "shm": entries live in a memory-mapped file written by a separate
+    # ``python -m app.refresher`` process; any number of workers read it.
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory").lower()
+    SHM_CACHE_PATH: str = os.getenv("SHM_CACHE_PATH", "/dev/shm/smartpanel.cache")
+    SHM_SLOTS: int = int(os.getenv("SHM_SLOTS", "16"))
+    SHM_SLOT_SIZE: int = int(os.getenv("SHM_SLOT_SIZE", "65536"))
+
+    # --- Logging ---
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    # Identical lines within this many seconds collapse into one summary
+    LOG_DEDUP_WINDOW: int = int(os.getenv("LOG_DEDUP_WINDOW", "300"))
+    # Per-logger budget (records/minute, ERROR+ exempt); 0 disables
+    LOG_RATE_PER_MIN: int = int(os.getenv("LOG_RATE_PER_MIN", "60"))
+
+    # --- Diagnostics (/api/diagnostics) ---
+    DIAG_LAG_INTERVAL: float = float(os.getenv("DIAG_LAG_INTERVAL", "0.5"))
+    # Callbacks holding the loop at least this long are recorded; 0 disables
+    DIAG_SLOW_CALLBACK_MS: int = int(os.getenv("DIAG_SLOW_CALLBACK_MS", "100"))
+
+    # --- Admission control (per client = API key or IP; 0 disables) ---
+    RATE_READ_PER_MIN: int = int(os.getenv("RATE_READ_PER_MIN", "240"))
+    RATE_READ_BURST: int = int(os.getenv("RATE_READ_BURST", "40"))
+    RATE_WRITE_PER_MIN: int = int(os.getenv("RATE_WRITE_PER_MIN", "300"))
+    RATE_WRITE_BURST: int = int(os.getenv("RATE_WRITE_BURST", "30"))
+    # Shed new requests with 503 above this loop lag / concurrency
+    SHED_LAG_MS: int = int(os.getenv("SHED_LAG_MS", "250"))
+    SHED_MAX_INFLIGHT: int = int(os.getenv("SHED_MAX_INFLIGHT", "32"))
+
+    # --- History (SQLite time series, see app/history.py) ---
+    HISTORY_ENABLED: bool = os.getenv("HISTORY_ENABLED", "true").lower() in ("true", "1", "yes")
+    HISTORY_DB_PATH: str = os.getenv("HISTORY_DB_PATH", "history.db")
+    HISTORY_FLUSH_SECONDS: int = int(os.getenv("HISTORY_FLUSH_SECONDS", "60"))
+    HISTORY_RAW_DAYS: float = float(os.getenv("HISTORY_RAW_DAYS", "2"))
+    HISTORY_MINUTE_DAYS: float = float(os.getenv("HISTORY_MINUTE_DAYS", "14"))
+    HISTORY_HOUR_DAYS: float = float(os.getenv("HISTORY_HOUR_DAYS", "180"))
+    HISTORY_DAY_DAYS: float = float(os.getenv("HISTORY_DAY_DAYS", "1825"))
+
+    # --- Dashboard frontend (served at /) ---
+    DASHBOARD_DIR: str = os.getenv("DASHBOARD_DIR", "dashboard")
+    DASHBOARD_BUILD_DIR: str = os.getenv("DASHBOARD_BUILD_DIR", "dashboard/.build")
 
     # --- Validation ---
     _REQUIRED = {
@@ -96,12 +192,46 @@ class Settings:
             val = os.getenv(primary, os.getenv(var, "0"))
             if val == "0":
                 log.warning("Env var %s is unset/default — %s", var, hint)
+        if cls.CACHE_BACKEND not in ("memory", "shm"):
+            log.error("CACHE_BACKEND=%s is not one of memory/shm", cls.CACHE_BACKEND)
+            fatal = True
+        from app.sources import all_sources
+
+        known = {src.key for src in all_sources()}
+        for key in cls.SOURCES_DISABLED:
+            if key not in known:
+                log.warning("SOURCES_DISABLED lists unknown source %r", key)
         if not os.getenv("HOMEBRIDGE_URL"):
             log.error("HOMEBRIDGE_URL is not set — cannot reach Homebridge")
             fatal = True
         if fatal:
             sys.exit(1)
 
+    @classmethod
+    def reload(cls) -> tuple[dict[str, tuple[Any, Any]], str | None]:
+        """Re-read the env file and refresh every setting in place.
+
+        The class body is re-evaluated against the updated environment (by
+        executing this module into a scratch namespace) so defaults and
+        aliases stay defined in one place.  Returns ({name: (old, new)} for
+        each setting whose value changed, env file error or None).  An
+        unreadable file leaves the environment as it was.
+        """
+        error = _apply_env_file()
+        spec = importlib.util.find_spec(__name__)
+        scratch = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(scratch)
+
+        changed: dict[str, tuple[Any, Any]] = {}
+        for name, new in vars(scratch.Settings).items():
+            if not name.isupper():
+                continue
+            old = getattr(cls, name, None)
+            if old != new:
+                changed[name] = (old, new)
+                setattr(cls, name, new)
+        return changed, error
+
     @classmethod
     def load_light_names(cls) -> dict[str, str]:
         """Return {uniqueId: display_name} from JSON file or empty dict."""
@@ -0,0 +1,189 @@
+"""Build and serve the iPad dashboard bundle.
+
+``build()`` walks DASHBOARD_DIR once (at startup, or at deploy time via
+``python -m app.dashboard``) and writes every asset except ``index.html``
+to DASHBOARD_BUILD_DIR under a content-hashed name, next to ``.gz`` and
+(if the optional ``brotli`` package is installed) ``.br`` variants.
+Hashed names never change content, so they are served with
+``Cache-Control: immutable``.
+
+``index.html`` is rewritten to point at the hashed names and kept in
+memory; each request gets the current cache snapshot inlined as
+``window.__SMARTPANEL__`` so the first paint needs no API calls.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+log = logging.getLogger(__name__)
+
+_INDEX = "index.html"
+_COMPRESSIBLE = (".js", ".css", ".html", ".svg", ".json", ".txt", ".map")
+_MIN_COMPRESS = 512
+_ASSET_REF = re.compile(r'''((?:src|href)=["'])(?:\./|/)?([^"'?#:]+)(["'])''')
+_SNAPSHOT_MARK = "</head>"
+
+
+@dataclass
+class Asset:
+    content_type: str
+    # encoding ("identity", "gzip", "br") -> file path
+    variants: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Bundle:
+    # hashed name -> asset
+    assets: dict[str, Asset] = field(default_factory=dict)
+    # index.html split around the snapshot insertion point
+    index_head: str = ""
+    index_tail: str = ""
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.index_head or self.index_tail)
+
+
+bundle = Bundle()
+
+
+def _hashed_name(rel: str, digest: str) -> str:
+    stem, ext = os.path.splitext(rel)
+    return f"{stem}.{digest[:10]}{ext}"
+
+
+def _write_if_missing(path: str, data: bytes) -> None:
+    """Atomically create *path*; safe with several workers building at once."""
+    if os.path.exists(path):
+        return
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Per-process temp name: workers share the build dir
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        # Another worker got there first; hashed names mean same content
+        if not os.path.exists(path):
+            raise
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _build_asset(src: str, rel: str, out_dir: str) -> tuple[str, Asset]:
+    with open(src, "rb") as f:
+        data = f.read()
+    name = _hashed_name(rel, hashlib.sha256(data).hexdigest())
+    out = os.path.join(out_dir, name)
+    ctype = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+    asset = Asset(content_type=ctype)
+
+    _write_if_missing(out, data)
+    asset.variants["identity"] = out
+    if rel.endswith(_COMPRESSIBLE) and len(data) >= _MIN_COMPRESS:
+        if not os.path.exists(out + ".gz"):
+            _write_if_missing(out + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+        asset.variants["gzip"] = out + ".gz"
+        if brotli is not None:
+            if not os.path.exists(out + ".br"):
+                _write_if_missing(out + ".br", brotli.compress(data, quality=11))
+            asset.variants["br"] = out + ".br"
+    return name, asset
+
+
+def build() -> Bundle:
+    """(Re)build the bundle from DASHBOARD_DIR; a no-op if it's missing."""
+    src_dir = settings.DASHBOARD_DIR
+    out_dir = settings.DASHBOARD_BUILD_DIR
+    index_path = os.path.join(src_dir, _INDEX)
+    if not os.path.exists(index_path):
+        log.info("No dashboard at %s; skipping bundle build", src_dir)
+        return bundle
+
+    out_abs = os.path.abspath(out_dir)
+    names: dict[str, str] = {}
+    assets: dict[str, Asset] = {}
+    for root, dirs, files in os.walk(src_dir):
+        # Never hash our own output or dotfiles
+        dirs[:] = [
+            d for d in dirs
+            if not d.startswith(".") and os.path.abspath(os.path.join(root, d)) != out_abs
+        ]
+        for fname in files:
+            if fname.startswith("."):
+                continue
+            src = os.path.join(root, fname)
+            rel = os.path.relpath(src, src_dir).replace(os.sep, "/")
+            if rel == _INDEX:
+                continue
+            name, asset = _build_asset(src, rel, out_dir)
+            names[rel] = name
+            assets[name] = asset
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    def _rewrite(m: re.Match) -> str:
+        hashed = names.get(m.group(2))
+        if hashed is None:
+            return m.group(0)
+        return f"{m.group(1)}/static/{hashed}{m.group(3)}"
+
+    html = _ASSET_REF.sub(_rewrite, html)
+    head, mark, tail = html.partition(_SNAPSHOT_MARK)
+    bundle.assets = assets
+    bundle.index_head = head if mark else ""
+    bundle.index_tail = (mark + tail) if mark else html
+    log.info(
+        "Dashboard bundle ready: %d assets%s",
+        len(assets),
+        "" if brotli is not None else " (gzip only; install brotli for br)",
+    )
+    return bundle
+
+
+def pick_encoding(asset: Asset, accept_encoding: str) -> str:
+    """Best available variant for an Accept-Encoding header."""
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in accept_encoding.split(",")
+        if not part.strip().endswith(";q=0")
+    }
+    for enc in ("br", "gzip"):
+        if enc in accepted and enc in asset.variants:
+            return enc
+    return "identity"
+
+
+def render_index(snapshot: dict | None) -> str:
+    """index.html with *snapshot* inlined (or no data if None)."""
+    if snapshot is None:
+        return bundle.index_head + bundle.index_tail
+    payload = json.dumps(snapshot, separators=(",", ":"), default=str)
+    # Keep "</script>" inside a string from closing the tag
+    payload = payload.replace("</", "<\\/")
+    script = f"<script>window.__SMARTPANEL__={payload};</script>\n"
+    return bundle.index_head + script + bundle.index_tail
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    build()
@@ -0,0 +1,185 @@
+"""Event-loop health: lag sampling, slow-callback capture, live task list.
+
+- A sampler task sleeps DIAG_LAG_INTERVAL seconds and records how late it
+  woke up; the last ~10 minutes of samples back the lag percentiles.
+- ``asyncio.events.Handle._run`` is wrapped so any callback that holds
+  the loop longer than DIAG_SLOW_CALLBACK_MS is recorded with its origin
+  (coroutine + file:line for task steps).  Set it to 0 to skip the wrap.
+- A task factory stamps each task's creation time so the live task list
+  can show ages.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from collections import deque
+
+from app.config import settings
+
+_MAX_SAMPLES = 1200
+_MAX_SLOW = 50
+_MAX_TASKS = 100
+
+
+def _percentile(sorted_vals: list[float], pct: float) -> float | None:
+    if not sorted_vals:
+        return None
+    idx = min(len(sorted_vals) - 1, int(round(pct / 100 * (len(sorted_vals) - 1))))
+    return round(sorted_vals[idx], 2)
+
+
+def _coro_location(coro) -> str:
+    """Describe a coroutine by its innermost suspended frame.
+
+    Follows the ``cr_await`` chain so a task parked inside a helper is
+    reported at the helper's line, not at the task's entry point.
+    """
+    outer = getattr(coro, "cr_code", None) or getattr(coro, "gi_code", None)
+    if outer is None:
+        return repr(coro)
+    code, frame = outer, getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+    inner = getattr(coro, "cr_await", None)
+    while inner is not None and getattr(inner, "cr_frame", None) is not None:
+        code, frame = inner.cr_code, inner.cr_frame
+        inner = getattr(inner, "cr_await", None)
+    line = frame.f_lineno if frame is not None else code.co_firstlineno
+    where = f"{code.co_qualname} ({code.co_filename}:{line})"
+    if code is outer:
+        return where
+    return f"{outer.co_qualname} -> {where}"
+
+
+def _callback_origin(handle: asyncio.Handle) -> str:
+    cb = handle._callback
+    owner = getattr(cb, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        return f"task {owner.get_name()}: {_coro_location(owner.get_coro())}"
+    return getattr(cb, "__qualname__", None) or repr(cb)
+
+
+class LoopMonitor:
+    def __init__(self) -> None:
+        self._lag_ms: deque[float] = deque(maxlen=_MAX_SAMPLES)
+        self._slow: deque[dict] = deque(maxlen=_MAX_SLOW)
+        self._slow_total = 0
+        self._task_born: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._sampler: asyncio.Task | None = None
+        self._orig_run = None
+
+    # ---- Lifecycle -------------------------------------------------------
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._install_task_factory(loop)
+        if settings.DIAG_SLOW_CALLBACK_MS > 0:
+            self._install_handle_timer()
+        self._sampler = asyncio.create_task(self._sample(), name="loop-lag-sampler")
+
+    async def stop(self) -> None:
+        if self._sampler is not None:
+            self._sampler.cancel()
+            await asyncio.gather(self._sampler, return_exceptions=True)
+            self._sampler = None
+        if self._orig_run is not None:
+            asyncio.events.Handle._run = self._orig_run
+            self._orig_run = None
+
+    def _install_task_factory(self, loop: asyncio.AbstractEventLoop) -> None:
+        inner = loop.get_task_factory()
+        born = self._task_born
+
+        def factory(loop, coro, **kwargs):
+            if inner is not None:
+                task = inner(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            born[task] = time.monotonic()
+            return task
+
+        loop.set_task_factory(factory)
+
+    def _install_handle_timer(self) -> None:
+        orig = asyncio.events.Handle._run
+        threshold = settings.DIAG_SLOW_CALLBACK_MS / 1000
+        monitor = self
+
+        def _run(handle):
+            start = time.perf_counter()
+            orig(handle)
+            elapsed = time.perf_counter() - start
+            if elapsed >= threshold:
+                monitor._record_slow(handle, elapsed)
+
+        self._orig_run = orig
+        asyncio.events.Handle._run = _run
+
+    def _record_slow(self, handle: asyncio.Handle, elapsed: float) -> None:
+        self._slow_total += 1
+        try:
+            origin = _callback_origin(handle)
+        except Exception:
+            origin = repr(handle)
+        self._slow.append({
+            "origin": origin,
+            "duration_ms": round(elapsed * 1000, 1),
+            "at": time.time(),
+        })
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.DIAG_LAG_INTERVAL
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            lag = loop.time() - start - interval
+            self._lag_ms.append(max(0.0, lag) * 1000)
+
+    # ---- Reporting -------------------------------------------------------
+
+    def current_lag_ms(self) -> float:
+        """Most recent lag sample (0 before the first one)."""
+        return self._lag_ms[-1] if self._lag_ms else 0.0
+
+    def lag_stats(self) -> dict:
+        vals = sorted(self._lag_ms)
+        return {
+            "samples": len(vals),
+            "interval_s": settings.DIAG_LAG_INTERVAL,
+            "last_ms": round(self.current_lag_ms(), 2),
+            "p50_ms": _percentile(vals, 50),
+            "p95_ms": _percentile(vals, 95),
+            "p99_ms": _percentile(vals, 99),
+            "max_ms": round(vals[-1], 2) if vals else None,
+        }
+
+    def slow_callbacks(self) -> dict:
+        return {
+            "threshold_ms": settings.DIAG_SLOW_CALLBACK_MS,
+            "total": self._slow_total,
+            "recent": list(reversed(self._slow)),
+        }
+
+    def tasks(self) -> list[dict]:
+        now = time.monotonic()
+        out: list[dict] = []
+        for task in asyncio.all_tasks():
+            born = self._task_born.get(task)
+            out.append({
+                "name": task.get_name(),
+                "coro": _coro_location(task.get_coro()),
+                "age_s": round(now - born, 1) if born is not None else None,
+            })
+        out.sort(key=lambda t: t["age_s"] or 0.0, reverse=True)
+        return out[:_MAX_TASKS]
+
+    def snapshot(self) -> dict:
+        return {
+            "loop_lag": self.lag_stats(),
+            "slow_callbacks": self.slow_callbacks(),
+            "tasks": self.tasks(),
+            "timestamp": time.time(),
+        }
+
+
+monitor = LoopMonitor()
@@ -0,0 +1,299 @@
+"""Long-term history of cached services in SQLite (WAL).
+
+Every successful refresh is flattened into numeric metrics (booleans
+become 0/1) and buffered in memory.  Every HISTORY_FLUSH_SECONDS the
+buffer is written in one transaction: raw rows go to ``samples`` and
+the same rows are folded into minute/hour/day rollups with upserts, so
+rollups are maintained incrementally and never rebuilt from raw data.
+
+All SQLite work runs on a single dedicated thread so the event loop
+never blocks on the SD card.  Old rows are pruned per table according
+to the HISTORY_*_DAYS retention settings.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+_DAY = 86400
+_MAX_PENDING = 20000
+_MAX_POINTS = 2000
+_PRUNE_EVERY = 3600
+
+# (table, bucket seconds) — finest first
+_ROLLUPS = (("rollup_minute", 60), ("rollup_hour", 3600), ("rollup_day", _DAY))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL, key TEXT NOT NULL, metric TEXT NOT NULL, value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_key_ts ON samples (key, ts);
+""" + "".join(
+    f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    key TEXT NOT NULL, metric TEXT NOT NULL, bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL, sum REAL NOT NULL, min REAL NOT NULL,
+    max REAL NOT NULL, last REAL NOT NULL,
+    PRIMARY KEY (key, metric, bucket)
+) WITHOUT ROWID;
+"""
+    for table, _ in _ROLLUPS
+)
+
+_UPSERT = """
+INSERT INTO {table} (key, metric, bucket, count, sum, min, max, last)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key, metric, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    sum = sum + excluded.sum,
+    min = MIN(min, excluded.min),
+    max = MAX(max, excluded.max),
+    last = excluded.last
+"""
+
+
+# ---- Metric extraction ---------------------------------------------------
+
+
+def _number(value: Any) -> float | None:
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+def _flatten(data: dict, prefix: str = "", depth: int = 2) -> dict[str, float]:
+    """Numeric/bool leaves of *data*, nested dicts joined with '.'."""
+    out: dict[str, float] = {}
+    for k, v in data.items():
+        name = f"{prefix}{k}"
+        if isinstance(v, dict):
+            if depth > 1:
+                out.update(_flatten(v, name + ".", depth - 1))
+            continue
+        num = _number(v)
+        if num is not None:
+            out[name] = num
+    return out
+
+
+def _light_metrics(data: list) -> dict[str, float]:
+    out: dict[str, float] = {"on_count": 0.0}
+    for light in data:
+        uid = light.get("uniqueId")
+        if not uid:
+            continue
+        on = bool(light.get("on"))
+        out["on_count"] += on
+        out[f"on.{uid}"] = float(on)
+        brightness = _number(light.get("brightness"))
+        if brightness is not None:
+            out[f"brightness.{uid}"] = brightness
+    return out
+
+
+def extract_metrics(key: str, data: Any) -> dict[str, float]:
+    """Turn a cached payload into {metric: value}."""
+    if key == "lights" and isinstance(data, list):
+        return _light_metrics(data)
+    if isinstance(data, dict):
+        return _flatten(data)
+    return {}
+
+
+# ---- Store ---------------------------------------------------------------
+
+
+class HistoryStore:
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._pending: list[tuple[float, str, str, float]] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+        self._conn: sqlite3.Connection | None = None
+        self._flusher: asyncio.Task | None = None
+        self._last_prune = 0.0
+
+    # Runs on the history thread only
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # ---- Writing ---------------------------------------------------------
+
+    def record(self, key: str, data: Any) -> None:
+        """Buffer one refresh result; cheap, called on the event loop."""
+        if self._flusher is None:
+            return  # this process doesn't own history writes
+        now = time.time()
+        try:
+            metrics = extract_metrics(key, data)
+        except Exception as e:
+            log.debug("History extract %s failed: %s", key, e)
+            return
+        self._pending.extend((now, key, m, v) for m, v in metrics.items())
+        if len(self._pending) > _MAX_PENDING:
+            del self._pending[: len(self._pending) - _MAX_PENDING]
+
+    def start(self) -> None:
+        """Begin periodic flushing in this process (the refresh owner)."""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop(), name="history-flush")
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+            await self.flush()
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.HISTORY_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                log.warning("History flush failed: %s", e)
+
+    async def flush(self) -> None:
+        rows, self._pending = self._pending, []
+        if rows:
+            await self._run(self._flush_sync, rows)
+
+    def _flush_sync(self, rows: list[tuple[float, str, str, float]]) -> None:
+        conn = self._db()
+        with conn:
+            conn.executemany(
+                "INSERT INTO samples (ts, key, metric, value) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            for table, size in _ROLLUPS:
+                agg: dict[tuple[str, str, int], list[float]] = {}
+                for ts, key, metric, value in rows:
+                    bucket = int(ts // size * size)
+                    a = agg.get((key, metric, bucket))
+                    if a is None:
+                        agg[(key, metric, bucket)] = [1, value, value, value, value]
+                    else:
+                        a[0] += 1
+                        a[1] += value
+                        a[2] = min(a[2], value)
+                        a[3] = max(a[3], value)
+                        a[4] = value
+                conn.executemany(
+                    _UPSERT.format(table=table),
+                    [(k, m, b, *a) for (k, m, b), a in agg.items()],
+                )
+        now = time.time()
+        if now - self._last_prune >= _PRUNE_EVERY:
+            self._prune_sync(conn, now)
+            self._last_prune = now
+
+    def _prune_sync(self, conn: sqlite3.Connection, now: float) -> None:
+        with conn:
+            conn.execute(
+                "DELETE FROM samples WHERE ts < ?",
+                (now - settings.HISTORY_RAW_DAYS * _DAY,),
+            )
+            for table, days in zip(
+                (t for t, _ in _ROLLUPS),
+                (settings.HISTORY_MINUTE_DAYS, settings.HISTORY_HOUR_DAYS, settings.HISTORY_DAY_DAYS),
+            ):
+                conn.execute(f"DELETE FROM {table} WHERE bucket < ?", (now - days * _DAY,))
+
+    # ---- Reading ---------------------------------------------------------
+
+    @staticmethod
+    def _pick_table(start: float, step: float) -> tuple[str, int]:
+        """Coarsest table no coarser than *step* that still covers *start*.
+
+        Failing that, the finest table that covers *start*, and failing
+        that, the longest-lived one.
+        """
+        now = time.time()
+        tables = [("samples", 1, settings.HISTORY_RAW_DAYS)] + [
+            (table, size, days)
+            for (table, size), days in zip(
+                _ROLLUPS,
+                (settings.HISTORY_MINUTE_DAYS, settings.HISTORY_HOUR_DAYS, settings.HISTORY_DAY_DAYS),
+            )
+        ]
+        covering = [t for t in tables if start >= now - t[2] * _DAY]
+        for table, size, _ in reversed(covering):
+            if size <= step:
+                return table, size
+        if covering:
+            # Nothing fine enough reaches back that far; use the finest that does
+            return min(covering, key=lambda t: t[1])[:2]
+        return max(tables, key=lambda t: t[2])[:2]
+
+    async def query(
+        self, key: str, start: float, end: float, step: float, metric: str | None = None
+    ) -> dict:
+        step = max(step, (end - start) / _MAX_POINTS, 1.0)
+        table, size = self._pick_table(start, step)
+        step = max(int(step // size * size), size)
+        series = await self._run(self._query_sync, table, key, start, end, step, metric)
+        return {
+            "key": key,
+            "from": start,
+            "to": end,
+            "step": step,
+            "source": table,
+            "series": series,
+        }
+
+    def _query_sync(
+        self, table: str, key: str, start: float, end: float, step: int, metric: str | None
+    ) -> dict[str, list]:
+        if table == "samples":
+            sql = (
+                "SELECT CAST(ts / :step AS INTEGER) * :step AS t, metric, "
+                "AVG(value), MIN(value), MAX(value) FROM samples "
+                "WHERE key = :key AND ts >= :start AND ts < :end"
+            )
+        else:
+            sql = (
+                "SELECT (bucket / :step) * :step AS t, metric, "
+                "SUM(sum) / SUM(count), MIN(min), MAX(max) FROM " + table + " "
+                "WHERE key = :key AND bucket >= :bstart AND bucket < :end"
+            )
+        if metric:
+            sql += " AND metric = :metric"
+        sql += " GROUP BY t, metric ORDER BY t"
+        params = {
+            "step": step,
+            "key": key,
+            "start": start,
+            # Include the bucket that contains *start*
+            "bstart": int(start // step * step),
+            "end": end,
+            "metric": metric,
+        }
+        series: dict[str, list] = {}
+        for t, m, avg, lo, hi in self._db().execute(sql, params):
+            series.setdefault(m, []).append([t, round(avg, 3), lo, hi])
+        return series
+
+
+history = HistoryStore(settings.HISTORY_DB_PATH)
@@ -0,0 +1,213 @@
+"""Logging setup tuned for journald on an SD card.
+
+Records are handed to a queue by a cheap handler on the calling thread
+(the event loop) and formatted/written by a background thread, so the
+loop never blocks on log I/O.  The background thread:
+
+- collapses identical messages seen within LOG_DEDUP_WINDOW seconds into
+  a single "[repeated N times ...]" summary line,
+- charges each logger a token-bucket budget of LOG_RATE_PER_MIN for the
+  records that survive dedup (ERROR and above are exempt); records over
+  budget are dropped and reported as a count,
+- buffers output and flushes once per drained batch instead of per line.
+
+Repeats are never charged, so a flapping upstream can't spend a logger's
+budget and crowd out its other warnings.  uvicorn's own loggers
+(including per-request access lines) are routed through the same path.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+from app.config import settings
+
+_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+_FLUSH_INTERVAL = 5.0
+_MAX_TRACKED = 256
+_STOP = object()
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: _LogWriter | None = None
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler without eager formatting."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same-process queue: leave formatting to the writer thread
+        return record
+
+
+class _Budget:
+    """Per-logger token bucket; used by the writer thread only."""
+
+    def __init__(self, per_minute: int) -> None:
+        self._rate = per_minute / 60.0
+        self._burst = float(max(1, per_minute))
+        # logger name -> [tokens, last refill]
+        self._buckets: dict[str, list[float]] = {}
+        self._dropped: dict[str, int] = {}
+
+    def allow(self, record: logging.LogRecord) -> bool:
+        if self._rate <= 0 or record.levelno >= logging.ERROR:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.get(record.name)
+        if bucket is None:
+            bucket = self._buckets[record.name] = [self._burst, now]
+        tokens = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            self._dropped[record.name] = self._dropped.get(record.name, 0) + 1
+            return False
+        bucket[0] = tokens - 1.0
+        return True
+
+    def take_dropped(self) -> dict[str, int]:
+        dropped, self._dropped = self._dropped, {}
+        return dropped
+
+
+class _BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler that leaves flushing to the writer thread."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class _LogWriter(threading.Thread):
+    """Background thread: dedup, summarise, write, flush."""
+
+    def __init__(
+        self,
+        q: queue.SimpleQueue,
+        budget: _Budget,
+        target: logging.Handler,
+        window: float,
+    ) -> None:
+        super().__init__(name="smartpanel-log", daemon=True)
+        self._q = q
+        self._budget = budget
+        self._target = target
+        self._window = window
+        # (name, level, message) -> [first_seen, suppressed_count, record]
+        self._seen: dict[tuple[str, int, str], list] = {}
+
+    def run(self) -> None:
+        last_sweep = time.monotonic()
+        while True:
+            try:
+                record = self._q.get(timeout=_FLUSH_INTERVAL)
+            except queue.Empty:
+                record = None
+            if record is _STOP:
+                break
+            if record is not None:
+                self._handle(record)
+                # Keep draining; flush once the queue is empty
+                if not self._q.empty():
+                    continue
+            now = time.monotonic()
+            if now - last_sweep >= _FLUSH_INTERVAL:
+                self._sweep(now)
+                last_sweep = now
+            self._target.flush()
+        self._sweep(time.monotonic(), final=True)
+        self._target.flush()
+
+    def _write(self, record: logging.LogRecord) -> None:
+        if self._budget.allow(record):
+            self._target.handle(record)
+
+    def _handle(self, record: logging.LogRecord) -> None:
+        if self._window <= 0:
+            self._write(record)
+            return
+        try:
+            key = (record.name, record.levelno, record.getMessage())
+        except Exception:
+            self._write(record)
+            return
+        now = time.monotonic()
+        entry = self._seen.get(key)
+        if entry is not None and now - entry[0] < self._window:
+            entry[1] += 1
+            entry[2] = record
+            return
+        if entry is not None and entry[1]:
+            self._emit_summary(entry, now)
+        if len(self._seen) >= _MAX_TRACKED:
+            oldest = min(self._seen, key=lambda k: self._seen[k][0])
+            stale = self._seen.pop(oldest)
+            if stale[1]:
+                self._emit_summary(stale, now)
+        self._seen[key] = [now, 0, record]
+        self._write(record)
+
+    def _emit_summary(self, entry: list, now: float) -> None:
+        first, count, record = entry
+        span = min(now, first + self._window) - first
+        summary = logging.makeLogRecord(record.__dict__)
+        summary.msg = "%s [repeated %d times in last %ds]"
+        summary.args = (record.getMessage(), count, round(span))
+        summary.exc_info = None
+        summary.exc_text = None
+        self._target.handle(summary)
+
+    def _sweep(self, now: float, final: bool = False) -> None:
+        for key in list(self._seen):
+            entry = self._seen[key]
+            if final or now - entry[0] >= self._window:
+                del self._seen[key]
+                if entry[1]:
+                    self._emit_summary(entry, now)
+        for name, count in self._budget.take_dropped().items():
+            self._target.handle(
+                logging.makeLogRecord({
+                    "name": name,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "Rate limit: dropped %d log records",
+                    "args": (count,),
+                })
+            )
+
+    def stop(self) -> None:
+        self._q.put(_STOP)
+        self.join(timeout=2.0)
+
+
+def setup_logging() -> None:
+    """Route the root logger through the dedup/queue pipeline (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    target = _BufferedStreamHandler(sys.stderr)
+    target.setFormatter(logging.Formatter(_FORMAT))
+
+    root = logging.getLogger()
+    root.handlers[:] = [_QueueHandler(q)]
+    root.setLevel(settings.LOG_LEVEL)
+    # uvicorn installs its own stream handlers (propagate=False) before the
+    # app is imported; without this, access lines are written synchronously
+    # on the event loop and skip dedup and the budget.
+    for name in _UVICORN_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.handlers[:] = []
+        logger.propagate = True
+
+    _listener = _LogWriter(q, _Budget(settings.LOG_RATE_PER_MIN), target, settings.LOG_DEDUP_WINDOW)
+    _listener.start()
+    atexit.register(_listener.stop)
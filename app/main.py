@@ -8,46 +8,28 @@ from contextlib import asynccontextmanager
 import httpx
 from fastapi import Depends, FastAPI
 
+from app import dashboard
+from app.admission import AdmissionMiddleware
 from app.auth import verify_api_key
-from app.cache import cache
 from app.config import Settings, settings
-from app.routes import health, lights
-from app.routes import network as network_routes
-from app.routes import pihole as pihole_routes
-from app.routes import todos as todos_routes
-from app.routes import weather as weather_routes
-from app.services import homebridge, network, pihole, todos, weather
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-)
+from app.diagnostics import monitor
+from app.logs import setup_logging
+from app.reload import reloader
+from app.routes import admin as admin_routes
+from app.routes import dashboard as dashboard_routes
+from app.routes import diagnostics as diagnostics_routes
+from app.routes import health
+from app.routes import history as history_routes
+from app.routes import sun as sun_routes
+from app.routes.sources import build_routers
+from app.scheduler import start_refresh_jobs, stop_refresh_jobs
+from app.services import sun
+from app.sources import enabled_sources
+
+setup_logging()
 log = logging.getLogger("smartpanel")
 
 
-async def _refresh_loop(
-    key: str,
-    fetcher,
-    interval: int,
-    timeout: float = 5.0,
-    initial_delay: float = 0.0,
-):
-    """Generic background refresh: call *fetcher*, store result in cache."""
-    if initial_delay:
-        await asyncio.sleep(initial_delay)
-    while True:
-        try:
-            data = await asyncio.wait_for(fetcher(), timeout=timeout)
-            cache.set(key, data)
-            log.debug("Refreshed %s", key)
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            log.warning("Refresh %s failed: %s", key, e)
-            cache.set_error(key, str(e))
-        await asyncio.sleep(interval)
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     client = httpx.AsyncClient(
@@ -55,68 +37,29 @@ async def lifespan(app: FastAPI):
         verify=settings.HOMEBRIDGE_VERIFY_TLS,
     )
     app.state.http = client
+    monitor.start()
+    await asyncio.to_thread(dashboard.build)
+    sun.table()
 
-    # Stagger startup slightly so not everything hits at t=0
-    tasks = [
-        asyncio.create_task(
-            _refresh_loop(
-                "lights",
-                lambda: homebridge.fetch_accessories(client),
-                settings.REFRESH_LIGHTS,
-                initial_delay=0,
-            )
-        ),
-        asyncio.create_task(
-            _refresh_loop(
-                "pihole",
-                lambda: pihole.fetch_status(client),
-                settings.REFRESH_PIHOLE,
-                initial_delay=1,
-            )
-        ),
-        asyncio.create_task(
-            _refresh_loop(
-                "network",
-                network.check_all,
-                settings.REFRESH_NETWORK,
-                timeout=8.0,
-                initial_delay=2,
-            )
-        ),
-        asyncio.create_task(
-            _refresh_loop(
-                "weather",
-                lambda: weather.fetch_today(client),
-                settings.REFRESH_WEATHER,
-                timeout=10.0,
-                initial_delay=3,
-            )
-        ),
-        asyncio.create_task(
-            _refresh_loop(
-                "todos",
-                todos.read_todos,
-                settings.REFRESH_TODOS,
-                initial_delay=0,
-            )
-        ),
-    ]
-
-    # Placeholder for future fitness integration
-    cache.set("fitness", {"placeholder": True})
+    # With the shared-memory cache, app.refresher owns the refresh loops
+    tasks: dict[str, asyncio.Task] | None = None
+    if settings.CACHE_BACKEND != "shm":
+        tasks = start_refresh_jobs(client)
+    reloader.attach(client, tasks, app)
 
     Settings.validate()
 
     log.info(
-        "SmartPanel started — %d background jobs, port %s",
-        len(tasks),
+        "SmartPanel started — %d background jobs, port %s, cache=%s",
+        len(tasks or {}),
         settings.PORT,
+        settings.CACHE_BACKEND,
     )
     yield
 
-    for t in tasks:
-        t.cancel()
-    await asyncio.gather(*tasks, return_exceptions=True)
+    await reloader.detach()
+    await stop_refresh_jobs(tasks or {})
+    await monitor.stop()
     await client.aclose()
     log.info("SmartPanel shutdown complete")
 
@@ -128,12 +71,16 @@ app = FastAPI(
     dependencies=[Depends(verify_api_key)],
 )
 
+app.add_middleware(AdmissionMiddleware)
+
 app.include_router(health.router)
-app.include_router(lights.router)
-app.include_router(pihole_routes.router)
-app.include_router(network_routes.router)
-app.include_router(weather_routes.router)
-app.include_router(todos_routes.router)
+for source_router in build_routers(enabled_sources()):
+    app.include_router(source_router)
+app.include_router(sun_routes.router)
+app.include_router(history_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(diagnostics_routes.router)
+app.include_router(dashboard_routes.router)
 
 
 if __name__ == "__main__":
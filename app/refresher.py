@@ -0,0 +1,61 @@
+"""Standalone refresher for ``CACHE_BACKEND=shm``.
+
+Runs every background refresh loop once for the whole host and publishes
+results into the shared-memory cache, so uvicorn can run several workers
+without each one polling Homebridge, Pi-hole and Open-Meteo itself.
+
+    python -m app.refresher
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import sys
+
+import httpx
+
+from app.cache import cache
+from app.config import Settings, settings
+from app.logs import setup_logging
+from app.reload import reloader
+from app.scheduler import start_refresh_jobs, stop_refresh_jobs
+
+setup_logging()
+log = logging.getLogger("smartpanel.refresher")
+
+
+async def main() -> None:
+    if settings.CACHE_BACKEND != "shm":
+        log.error("CACHE_BACKEND must be 'shm' to run the standalone refresher")
+        sys.exit(1)
+    Settings.validate()
+    cache.create()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(5.0),
+        verify=settings.HOMEBRIDGE_VERIFY_TLS,
+    )
+    tasks = start_refresh_jobs(client)
+    reloader.attach(client, tasks)
+    log.info(
+        "Refresher started — %d background jobs, publishing to %s",
+        len(tasks),
+        settings.SHM_CACHE_PATH,
+    )
+
+    await stop.wait()
+
+    await reloader.detach()
+    await stop_refresh_jobs(tasks)
+    await client.aclose()
+    log.info("Refresher shutdown complete")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
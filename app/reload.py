@@ -0,0 +1,236 @@
+"""Live configuration reload (SIGHUP, POST /api/admin/reload, light file).
+
+A reload re-reads the env file via ``Settings.reload()`` and acts only on
+what changed:
+
+- a source whose definition (interval, timeout, ...) or ``depends``
+  settings changed has just its refresh job restarted, which also
+  refreshes it immediately;
+- sources newly listed in / removed from SOURCES_DISABLED are stopped /
+  started (and routed);
+- Homebridge credentials reset the auth token, light filters rebuild the
+  light-name index, a new location rebuilds the sun table;
+- settings only read at startup are reported as needing a restart.
+
+LIGHT_CONFIG_PATH is also polled for mtime changes so editing the light
+map needs no signal at all.
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+import os
+import signal
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.config import Settings, settings
+from app.scheduler import start_source_job, stop_job
+from app.sources import Source, all_sources
+
+log = logging.getLogger(__name__)
+
+_LIGHT_POLL_SECONDS = 5.0
+
+# Read once when the process starts; a change needs a restart
+_RESTART_REQUIRED = frozenset({
+    "HOST",
+    "PORT",
+    "CACHE_BACKEND",
+    "SHM_CACHE_PATH",
+    "SHM_SLOTS",
+    "SHM_SLOT_SIZE",
+    "HOMEBRIDGE_VERIFY_TLS",
+    "HISTORY_ENABLED",
+    "HISTORY_DB_PATH",
+    "LOG_DEDUP_WINDOW",
+    "LOG_RATE_PER_MIN",
+    "DIAG_LAG_INTERVAL",
+    "DIAG_SLOW_CALLBACK_MS",
+})
+_HOMEBRIDGE_AUTH = frozenset({"HOMEBRIDGE_URL", "HOMEBRIDGE_USERNAME", "HOMEBRIDGE_PASSWORD"})
+_LIGHT_FILTER = frozenset({"LIGHT_IDS", "LIGHT_CONFIG_PATH"})
+_LOCATION = frozenset({"WEATHER_LAT", "WEATHER_LON", "TZ"})
+_RATE_LIMITS = frozenset({
+    "RATE_READ_PER_MIN",
+    "RATE_READ_BURST",
+    "RATE_WRITE_PER_MIN",
+    "RATE_WRITE_BURST",
+})
+
+
+def _light_mtime() -> float | None:
+    path = settings.LIGHT_CONFIG_PATH
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+class Reloader:
+    def __init__(self) -> None:
+        self._app: FastAPI | None = None
+        self._client: httpx.AsyncClient | None = None
+        # Shared with the caller so shutdown stops whatever is current
+        self._jobs: dict[str, asyncio.Task] | None = None
+        self._sources: dict[str, Source] = {}
+        self._lock = asyncio.Lock()
+        self._watcher: asyncio.Task | None = None
+        self._light_mtime: float | None = None
+
+    def attach(
+        self,
+        client: httpx.AsyncClient,
+        jobs: dict[str, asyncio.Task] | None,
+        app: FastAPI | None = None,
+    ) -> None:
+        """Start listening for reload triggers.
+
+        *jobs* is None in processes that don't run refresh jobs (API
+        workers with CACHE_BACKEND=shm); they only pick up settings.
+        """
+        self._client = client
+        self._jobs = jobs
+        self._app = app
+        self._sources = {src.key: src for src in all_sources()}
+        self._light_mtime = _light_mtime()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(
+                signal.SIGHUP, lambda: asyncio.create_task(self.reload("SIGHUP"))
+            )
+        except (NotImplementedError, RuntimeError, ValueError):
+            log.debug("SIGHUP reload unavailable in this thread")
+        if jobs is not None:
+            self._watcher = asyncio.create_task(self._watch_lights(), name="light-config-watch")
+
+    async def detach(self) -> None:
+        if self._watcher is not None:
+            await stop_job(self._watcher)
+            self._watcher = None
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+
+    async def _watch_lights(self) -> None:
+        while True:
+            await asyncio.sleep(_LIGHT_POLL_SECONDS)
+            mtime = _light_mtime()
+            if mtime != self._light_mtime:
+                self._light_mtime = mtime
+                log.info("Light config %s changed", settings.LIGHT_CONFIG_PATH)
+                async with self._lock:
+                    self._reset_light_names()
+                    await self._restart("lights")
+
+    async def reload(self, reason: str = "manual") -> dict:
+        """Re-read configuration and apply it; returns a change summary."""
+        async with self._lock:
+            return await self._reload(reason)
+
+    async def _reload(self, reason: str) -> dict:
+        changed, env_error = Settings.reload()
+        names = set(changed)
+        summary = {
+            "reason": reason,
+            "env_file_error": env_error,
+            "changed": sorted(names),
+            "restarted": [],
+            "started": [],
+            "stopped": [],
+            "restart_required": sorted(names & _RESTART_REQUIRED),
+            "timestamp": time.time(),
+        }
+
+        if "LOG_LEVEL" in names:
+            logging.getLogger().setLevel(settings.LOG_LEVEL)
+        if names & _RATE_LIMITS:
+            from app.admission import admission
+
+            admission.reset()
+        if names & _HOMEBRIDGE_AUTH and "app.services.homebridge" in sys.modules:
+            sys.modules["app.services.homebridge"].reset_auth()
+        if names & _LOCATION:
+            from app.services import sun
+
+            sun.table()  # rebuild now rather than on the next request
+        mtime = _light_mtime()
+        if names & _LIGHT_FILTER or mtime != self._light_mtime:
+            self._light_mtime = mtime
+            self._reset_light_names()
+            names.add("LIGHT_CONFIG_PATH")  # force a lights restart below
+
+        # Pick up a freshly deployed dashboard bundle
+        from app import dashboard
+
+        await asyncio.to_thread(dashboard.build)
+
+        new_sources = {src.key: src for src in all_sources()}
+        if self._jobs is not None:
+            for key, src in new_sources.items():
+                running = key in self._jobs
+                if running and not src.enabled:
+                    await stop_job(self._jobs.pop(key))
+                    summary["stopped"].append(key)
+                elif not running and src.enabled:
+                    self._jobs[key] = start_source_job(
+                        dataclasses.replace(src, initial_delay=0), self._client
+                    )
+                    summary["started"].append(key)
+                elif running and (src != self._sources.get(key) or names & set(src.depends)):
+                    await self._restart(key, src)
+                    summary["restarted"].append(key)
+        if self._app is not None:
+            self._route_new_sources(new_sources)
+        self._sources = new_sources
+
+        log.info(
+            "Config reloaded (%s): changed=%s restarted=%s started=%s stopped=%s",
+            reason,
+            summary["changed"],
+            summary["restarted"],
+            summary["started"],
+            summary["stopped"],
+        )
+        if env_error:
+            log.warning("Reload kept the current environment: %s", env_error)
+        if summary["restart_required"]:
+            log.warning("Restart needed to apply: %s", ", ".join(summary["restart_required"]))
+        return summary
+
+    def _reset_light_names(self) -> None:
+        if "app.services.homebridge" in sys.modules:
+            sys.modules["app.services.homebridge"].reload_light_names()
+
+    async def _restart(self, key: str, src: Source | None = None) -> None:
+        if self._jobs is None or key not in self._jobs:
+            return
+        src = src or next(s for s in all_sources() if s.key == key)
+        await stop_job(self._jobs[key])
+        self._jobs[key] = start_source_job(
+            dataclasses.replace(src, initial_delay=0), self._client
+        )
+
+    def _route_new_sources(self, new_sources: dict[str, Source]) -> None:
+        """Add routes for sources enabled since startup.
+
+        Routes of sources disabled at runtime stay mounted (serving their
+        last cached value) until the next restart.
+        """
+        from app.routes.sources import build_routers
+
+        mounted = {getattr(r, "path", None) for r in self._app.router.routes}
+        fresh = [
+            src for key, src in new_sources.items()
+            if src.enabled and src.path and src.path not in mounted
+        ]
+        for router in build_routers(fresh):
+            self._app.include_router(router)
+
+
+reloader = Reloader()
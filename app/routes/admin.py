@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+
+from app.config import settings
+from app.reload import reloader
+
+router = APIRouter(prefix="/api/admin")
+
+
+@router.post("/reload")
+async def reload_config():
+    if settings.CACHE_BACKEND == "shm":
+        # This request reaches one worker; the others and the refresher
+        # would keep the old settings
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                "CACHE_BACKEND=shm runs several processes; apply changes with "
+                "`sudo systemctl reload smartpanel-refresher && "
+                "sudo systemctl restart smartpanel`"
+            ),
+        )
+    return await reloader.reload("api")
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+from app.config import settings
+from app.dashboard import bundle, pick_encoding, render_index
+from app.routes.sources import read
+from app.sources import enabled_sources
+
+router = APIRouter(include_in_schema=False)
+
+_IMMUTABLE = "public, max-age=31536000, immutable"
+_SESSION_COOKIE = "smartpanel_session"
+_SESSION_MAX_AGE = 365 * 86400
+
+
+def _session_token() -> str:
+    """Cookie value derived from the API key; changes when the key does."""
+    return hmac.new(settings.API_KEY.encode(), b"dashboard-snapshot", hashlib.sha256).hexdigest()
+
+
+def _authorized(request: Request) -> bool:
+    """The page shell is public; the inlined data needs the API key.
+
+    A page load can't send headers, so the dashboard trades the key for an
+    HttpOnly cookie once (POST /api/session).  The key itself never goes
+    in a URL, where access logs and browser history would keep it.
+    """
+    if not settings.API_KEY:
+        return True
+    if request.headers.get("X-API-KEY") == settings.API_KEY:
+        return True
+    cookie = request.cookies.get(_SESSION_COOKIE, "")
+    return hmac.compare_digest(cookie, _session_token())
+
+
+@router.get("/")
+async def dashboard_index(request: Request):
+    if not bundle.ready:
+        raise HTTPException(status_code=404, detail="Dashboard bundle not built")
+    snapshot = None
+    if _authorized(request):
+        snapshot = {src.key: read(src) for src in enabled_sources()}
+    body = render_index(snapshot).encode()
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", "") and len(body) >= 1024:
+        body = gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="text/html; charset=utf-8", headers=headers)
+
+
+@router.post("/api/session", status_code=204)
+async def dashboard_session():
+    """Set the snapshot cookie; reached only with a valid X-API-KEY."""
+    response = Response(status_code=204)
+    if settings.API_KEY:
+        response.set_cookie(
+            _SESSION_COOKIE,
+            _session_token(),
+            max_age=_SESSION_MAX_AGE,
+            httponly=True,
+            samesite="strict",
+        )
+    return response
+
+
+@router.get("/static/{name:path}")
+async def dashboard_asset(name: str, request: Request):
+    asset = bundle.assets.get(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    encoding = pick_encoding(asset, request.headers.get("accept-encoding", ""))
+    headers = {"Cache-Control": _IMMUTABLE, "Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return FileResponse(
+        asset.variants[encoding], media_type=asset.content_type, headers=headers
+    )
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from app.admission import admission
+from app.diagnostics import monitor
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/diagnostics")
+async def get_diagnostics():
+    return {**monitor.snapshot(), "admission": admission.stats()}
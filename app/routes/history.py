@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import time
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.config import settings
+from app.history import history
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/history/{key}")
+async def get_history(
+    key: str,
+    start: float | None = Query(default=None, alias="from"),
+    end: float | None = Query(default=None, alias="to"),
+    step: float = Query(default=300, gt=0),
+    metric: str | None = None,
+):
+    if not settings.HISTORY_ENABLED:
+        raise HTTPException(status_code=404, detail="History is disabled")
+    end = end if end is not None else time.time()
+    start = start if start is not None else end - 86400
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    return await history.query(key, start, end, step, metric)
@@ -4,6 +4,7 @@ import asyncio
 import time
 
 from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field
 
 from app.cache import cache
 from app.config import settings
@@ -36,9 +37,60 @@ async def _delayed_refresh(client, delay: float = 2.0) -> None:
         pass  # next regular cycle will catch up
 
 
-@router.get("/lights")
-async def get_lights():
-    return cache.get("lights")
+class LightOp(BaseModel):
+    """One entry of a batch write; omitted characteristics are left alone."""
+
+    uniqueId: str
+    On: bool | None = None
+    Brightness: int | None = Field(default=None, ge=0, le=100)
+
+
+def _apply_optimistic(ops: list[LightOp]) -> None:
+    """Patch the cached light list so the next GET reflects the writes.
+
+    Only ``data`` changes: updated_at and error still describe the last
+    real refresh, so a slider move can't make a down Homebridge look fresh.
+    """
+    entry = cache.get("lights")
+    lights_data = entry.get("data")
+    if not isinstance(lights_data, list):
+        return
+    patch: dict[str, dict] = {}
+    for op in ops:
+        p = patch.setdefault(op.uniqueId, {})
+        if op.On is not None:
+            p["on"] = op.On
+        if op.Brightness is not None:
+            p["brightness"] = op.Brightness
+    cache.replace_data(
+        "lights",
+        [
+            {**light, **patch[light.get("uniqueId")]}
+            if light.get("uniqueId") in patch
+            else light
+            for light in lights_data
+        ],
+    )
+
+
+@router.post("/lights/batch")
+async def batch_lights(ops: list[LightOp], request: Request):
+    writes = []
+    for op in ops:
+        if op.On is not None:
+            writes.append((op.uniqueId, "On", op.On))
+        if op.Brightness is not None:
+            writes.append((op.uniqueId, "Brightness", op.Brightness))
+    if not writes:
+        raise HTTPException(status_code=400, detail="No On/Brightness values given")
+
+    client = request.app.state.http
+    _apply_optimistic(ops)
+    result = await homebridge.write_characteristics(client, writes)
+    if result["failed_ids"]:
+        # Undo the optimistic patch for anything Homebridge rejected
+        asyncio.create_task(_delayed_refresh(client, delay=0.5))
+    return result
 
 
 @router.post("/lights/{unique_id}/toggle")
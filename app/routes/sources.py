@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import importlib
+
+from fastapi import APIRouter
+
+from app.cache import cache
+from app.sources import Source
+
+
+def read(src: Source) -> dict:
+    """The cached entry for *src* as its GET route serves it."""
+    entry = cache.get(src.key)
+    view = src.load_view()
+    return view(entry) if view else entry
+
+
+def _getter(src: Source):
+    async def get_cached():
+        return read(src)
+
+    get_cached.__name__ = f"get_{src.key}"
+    return get_cached
+
+
+def build_routers(sources: list[Source]) -> list[APIRouter]:
+    """One GET route per source plus each source's extra router, if any."""
+    router = APIRouter()
+    routers = [router]
+    for src in sources:
+        if src.path:
+            router.add_api_route(src.path, _getter(src), methods=["GET"])
+        if src.routes:
+            routers.append(importlib.import_module(src.routes).router)
+    return routers
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter
+
+from app.config import settings
+from app.services import sun
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/sun")
+async def get_sun():
+    now = datetime.now(ZoneInfo(settings.TZ))
+    return {
+        "today": sun.sun_times(now.date()),
+        "tomorrow": sun.sun_times(now.date() + timedelta(days=1)),
+        "is_daylight": sun.is_daylight(now),
+    }
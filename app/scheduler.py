@@ -0,0 +1,94 @@
+"""Background refresh jobs.
+
+Shared by the API process (single-worker mode) and the standalone
+refresher (``python -m app.refresher``) used with the shared-memory cache.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+import httpx
+
+from app.cache import cache
+from app.config import settings
+from app.history import history
+from app.sources import Source, enabled_sources
+
+log = logging.getLogger("smartpanel")
+
+
+def _payload_size(data) -> int:
+    return len(json.dumps(data, separators=(",", ":"), default=str))
+
+
+async def refresh_loop(
+    key: str,
+    fetcher,
+    interval: int,
+    timeout: float = 5.0,
+    initial_delay: float = 0.0,
+    max_bytes: int | None = None,
+):
+    """Generic background refresh: call *fetcher*, store result in cache.
+
+    Results larger than *max_bytes* (JSON-encoded) are recorded as an
+    error and the previous data is kept.
+    """
+    if initial_delay:
+        await asyncio.sleep(initial_delay)
+    while True:
+        try:
+            data = await asyncio.wait_for(fetcher(), timeout=timeout)
+            if max_bytes is not None:
+                size = _payload_size(data)
+                if size > max_bytes:
+                    raise ValueError(
+                        f"payload {size} bytes exceeds budget of {max_bytes}"
+                    )
+            cache.set(key, data)
+            history.record(key, data)
+            log.debug("Refreshed %s", key)
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            log.warning("Refresh %s failed: %s", key, e)
+            cache.set_error(key, str(e))
+        await asyncio.sleep(interval)
+
+
+def start_source_job(src: Source, client: httpx.AsyncClient) -> asyncio.Task:
+    fetch = src.load_fetcher()
+    fetcher = (lambda: fetch(client)) if src.needs_client else fetch
+    return asyncio.create_task(
+        refresh_loop(
+            src.key,
+            fetcher,
+            src.interval,
+            timeout=src.timeout,
+            initial_delay=src.initial_delay,
+            max_bytes=src.max_bytes,
+        ),
+        name=f"refresh:{src.key}",
+    )
+
+
+def start_refresh_jobs(client: httpx.AsyncClient) -> dict[str, asyncio.Task]:
+    """Create one refresh task per enabled source, keyed by source key.
+
+    The process running the refresh jobs also owns history writes.
+    """
+    if settings.HISTORY_ENABLED:
+        history.start()
+    return {src.key: start_source_job(src, client) for src in enabled_sources()}
+
+
+async def stop_job(task: asyncio.Task) -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def stop_refresh_jobs(tasks: dict[str, asyncio.Task]) -> None:
+    await asyncio.gather(*(stop_job(t) for t in tasks.values()))
+    await history.stop()
@@ -0,0 +1,155 @@
+"""Minimal asyncio DNS client (UDP, A records) for resolver health checks.
+
+Queries go straight to each resolver's port 53 with a fresh socket and a
+random query ID, so they bypass the system resolver cache and never touch
+the default thread pool the way ``loop.getaddrinfo`` does.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+import struct
+import time
+
+log = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("!HHHHHH")
+_QTYPE_A = 1
+_QCLASS_IN = 1
+_FLAG_RD = 0x0100
+_FLAG_QR = 0x8000
+
+RCODES = {
+    0: "NOERROR",
+    1: "FORMERR",
+    2: "SERVFAIL",
+    3: "NXDOMAIN",
+    4: "NOTIMP",
+    5: "REFUSED",
+}
+
+
+def _encode_name(name: str) -> bytes:
+    out = bytearray()
+    for label in name.rstrip(".").split("."):
+        raw = label.encode("idna")
+        if not 0 < len(raw) < 64:
+            raise ValueError(f"Invalid DNS label in {name!r}")
+        out.append(len(raw))
+        out += raw
+    out.append(0)
+    return bytes(out)
+
+
+def build_query(qid: int, name: str) -> bytes:
+    """Build a recursive A/IN query for *name*."""
+    return (
+        _HEADER.pack(qid, _FLAG_RD, 1, 0, 0, 0)
+        + _encode_name(name)
+        + struct.pack("!HH", _QTYPE_A, _QCLASS_IN)
+    )
+
+
+def _skip_name(buf: bytes, pos: int) -> int:
+    """Return the offset just past the (possibly compressed) name at *pos*."""
+    while True:
+        length = buf[pos]
+        if length == 0:
+            return pos + 1
+        if length & 0xC0 == 0xC0:
+            return pos + 2  # compression pointer ends the name
+        pos += 1 + length
+
+
+def parse_response(buf: bytes, qid: int) -> dict:
+    """Parse a response to ``build_query``.
+
+    Returns {rcode, addresses, ttl}; raises ValueError if the packet is not
+    a response to *qid*.
+    """
+    if len(buf) < _HEADER.size:
+        raise ValueError("Short DNS response")
+    rid, flags, qdcount, ancount, _, _ = _HEADER.unpack_from(buf, 0)
+    if rid != qid or not flags & _FLAG_QR:
+        raise ValueError("DNS response ID mismatch")
+    pos = _HEADER.size
+    for _ in range(qdcount):
+        pos = _skip_name(buf, pos) + 4
+    addresses: list[str] = []
+    ttl: int | None = None
+    for _ in range(ancount):
+        pos = _skip_name(buf, pos)
+        rtype, rclass, rttl, rdlen = struct.unpack_from("!HHIH", buf, pos)
+        pos += 10
+        if rtype == _QTYPE_A and rclass == _QCLASS_IN and rdlen == 4:
+            addresses.append(".".join(str(b) for b in buf[pos:pos + 4]))
+            ttl = rttl if ttl is None else min(ttl, rttl)
+        pos += rdlen
+    rcode = flags & 0x000F
+    return {"rcode": RCODES.get(rcode, str(rcode)), "addresses": addresses, "ttl": ttl}
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, qid: int, done: asyncio.Future) -> None:
+        self._qid = qid
+        self._done = done
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if self._done.done():
+            return
+        try:
+            self._done.set_result(parse_response(data, self._qid))
+        except (ValueError, IndexError, struct.error):
+            pass  # stray or malformed packet; keep waiting
+
+    def error_received(self, exc: Exception) -> None:
+        if not self._done.done():
+            self._done.set_exception(exc)
+
+
+async def query(server: str, name: str, *, timeout: float = 1.5) -> dict:
+    """Send one A query to *server*:53 and time it.
+
+    Returns {ok, rcode, addresses, ttl, latency_ms, error}.
+    """
+    loop = asyncio.get_running_loop()
+    qid = secrets.randbits(16)
+    try:
+        packet = build_query(qid, name)
+    except ValueError as e:  # empty/oversized label, bad IDNA (UnicodeError)
+        return _failed(f"invalid name {name!r}: {e}")
+    done: asyncio.Future = loop.create_future()
+    transport = None
+    start = time.monotonic()
+    try:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _QueryProtocol(qid, done), remote_addr=(server, 53)
+        )
+        transport.sendto(packet)
+        result = await asyncio.wait_for(done, timeout=timeout)
+        latency = round((time.monotonic() - start) * 1000, 1)
+        return {
+            "ok": result["rcode"] == "NOERROR" and bool(result["addresses"]),
+            **result,
+            "latency_ms": latency,
+            "error": None,
+        }
+    except asyncio.TimeoutError:
+        return _failed("timeout")
+    except OSError as e:
+        return _failed(str(e))
+    finally:
+        if transport is not None:
+            transport.close()
+
+
+def _failed(error: str) -> dict:
+    return {
+        "ok": False,
+        "rcode": None,
+        "addresses": [],
+        "ttl": None,
+        "latency_ms": None,
+        "error": error,
+    }
@@ -0,0 +1,7 @@
+"""Fitness summary — placeholder until a real integration lands."""
+from __future__ import annotations
+
+
+async def fetch_summary() -> dict:
+    """Return the placeholder payload the dashboard checks for."""
+    return {"placeholder": True}
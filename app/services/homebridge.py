@@ -1,12 +1,18 @@
 """Homebridge UI X REST API client.
 
 Handles authentication (token refresh on 401), accessory listing,
-single-light toggle, and batch scene actions.
+single-light toggle, batch scene actions, and coalesced characteristic
+writes for sliders.
 """
 from __future__ import annotations
 
+import asyncio
+import codecs
+import json
 import logging
 import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator
 
 import httpx
 
@@ -17,7 +23,8 @@ log = logging.getLogger(__name__)
 # Module-level token — safe for single-worker async
 _token: str | None = None
 
-# Light ID filter + display-name overrides (loaded once at first refresh)
+# Light ID filter + display-name overrides (loaded at first refresh and
+# again after reload_light_names())
 _light_names: dict[str, str] | None = None
 
 
@@ -33,6 +40,18 @@ def _get_light_names() -> dict[str, str]:
     return _light_names
 
 
+def reload_light_names() -> None:
+    """Drop the cached light map so the next refresh re-reads it."""
+    global _light_names
+    _light_names = None
+
+
+def reset_auth() -> None:
+    """Forget the token, e.g. after Homebridge credentials change."""
+    global _token
+    _token = None
+
+
 async def _login(client: httpx.AsyncClient) -> str:
     global _token
     resp = await client.post(
@@ -54,18 +73,83 @@ def _headers() -> dict[str, str]:
     return {}
 
 
-async def _authed_get(client: httpx.AsyncClient, path: str):
-    """GET with auto-reauth on 401."""
-    resp = await client.get(
-        f"{settings.HOMEBRIDGE_URL}{path}", headers=_headers()
-    )
-    if resp.status_code == 401:
-        await _login(client)
-        resp = await client.get(
-            f"{settings.HOMEBRIDGE_URL}{path}", headers=_headers()
-        )
-    resp.raise_for_status()
-    return resp.json()
+# Only these service types are exposed as lights
+_LIGHT_TYPES = ("Lightbulb", "Switch", "Outlet")
+# Only these characteristic values are kept from each accessory
+_KEEP_VALUES = ("On", "Brightness")
+
+_decoder = json.JSONDecoder()
+
+
+def _slim_accessory(acc: dict) -> dict:
+    """Reduce a full accessory object to the fields we actually use."""
+    values = acc.get("values") or {}
+    return {
+        "uniqueId": acc.get("uniqueId"),
+        "type": acc.get("type", ""),
+        "serviceName": acc.get(
+            "serviceName",
+            (acc.get("accessoryInformation") or {}).get("Name", "Unknown"),
+        ),
+        "values": {k: values[k] for k in _KEEP_VALUES if k in values},
+        "room": (acc.get("instance") or {}).get("name"),
+    }
+
+
+async def _iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yield elements of a top-level JSON array as the bytes arrive.
+
+    Only the element currently being parsed is held in memory, so peak
+    usage depends on the largest accessory, not on how many there are.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False
+    done = False
+    async for chunk in chunks:
+        buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        while True:
+            # Skip whitespace and separators between elements
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf) or done:
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array from /api/accessories")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                done = True
+                pos += 1
+                break
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element spans the next chunk
+            pos = end
+            yield item
+    buf = buf[pos:] + utf8.decode(b"", final=True)
+    if not done or buf.strip():
+        raise ValueError("Truncated or malformed /api/accessories response")
+
+
+async def _iter_accessories(client: httpx.AsyncClient) -> AsyncIterator[dict]:
+    """Stream /api/accessories and yield slimmed accessories one by one."""
+    url = f"{settings.HOMEBRIDGE_URL}/api/accessories"
+    for attempt in range(2):
+        async with client.stream("GET", url, headers=_headers()) as resp:
+            if resp.status_code == 401 and attempt == 0:
+                await _login(client)
+                continue
+            resp.raise_for_status()
+            async for acc in _iter_json_array(resp.aiter_bytes()):
+                if isinstance(acc, dict):
+                    yield _slim_accessory(acc)
+            return
 
 
 async def _authed_put(client: httpx.AsyncClient, path: str, body: dict):
@@ -91,28 +175,23 @@ async def fetch_accessories(client: httpx.AsyncClient) -> list[dict]:
     When LIGHT_IDS or LIGHT_CONFIG_PATH is set, only matching accessories
     are returned and display names are overridden where configured.
     """
-    raw = await _authed_get(client, "/api/accessories")
     name_map = _get_light_names()
     filter_active = bool(name_map)
 
     lights: list[dict] = []
-    for acc in raw:
-        uid = acc.get("uniqueId")
-        stype = acc.get("type", "")
-        if stype not in ("Lightbulb", "Switch", "Outlet"):
+    async for acc in _iter_accessories(client):
+        uid = acc["uniqueId"]
+        stype = acc["type"]
+        if stype not in _LIGHT_TYPES:
             continue
 
         # If a filter is configured, skip lights not in the map
         if filter_active and uid not in name_map:
             continue
 
-        values = acc.get("values", {})
-        hb_name = acc.get(
-            "serviceName",
-            acc.get("accessoryInformation", {}).get("Name", "Unknown"),
-        )
+        values = acc["values"]
         # Use configured display name if non-empty, else Homebridge name
-        display_name = name_map.get(uid, "") or hb_name
+        display_name = name_map.get(uid, "") or acc["serviceName"]
 
         lights.append(
             {
@@ -121,7 +200,7 @@ async def fetch_accessories(client: httpx.AsyncClient) -> list[dict]:
                 "type": stype,
                 "on": bool(values.get("On", False)),
                 "brightness": values.get("Brightness"),
-                "room": acc.get("instance", {}).get("name"),
+                "room": acc["room"],
             }
         )
     return lights
@@ -129,16 +208,16 @@ async def fetch_accessories(client: httpx.AsyncClient) -> list[dict]:
 
 async def toggle_light(client: httpx.AsyncClient, unique_id: str) -> dict:
     """Toggle a single light and return its new state."""
-    raw = await _authed_get(client, "/api/accessories")
     target = None
-    for acc in raw:
-        if acc.get("uniqueId") == unique_id:
-            target = acc
-            break
+    async with aclosing(_iter_accessories(client)) as accessories:
+        async for acc in accessories:
+            if acc["uniqueId"] == unique_id:
+                target = acc
+                break
     if not target:
         raise ValueError(f"Accessory {unique_id} not found")
 
-    current_on = target.get("values", {}).get("On", False)
+    current_on = target["values"].get("On", False)
     new_val = not current_on
 
     await _authed_put(
@@ -149,7 +228,7 @@ async def toggle_light(client: httpx.AsyncClient, unique_id: str) -> dict:
 
     return {
         "uniqueId": unique_id,
-        "name": target.get("serviceName", "Unknown"),
+        "name": target["serviceName"],
         "on": new_val,
     }
 
@@ -182,3 +261,120 @@ async def set_lights(
         "errors": errors,
         "timestamp": time.time(),
     }
+
+
+# ---- Coalesced characteristic writes -----------------------------------
+
+# Latest requested value per (uniqueId, characteristic) plus everyone
+# waiting on it.  A slider emitting dozens of values inside one window
+# collapses to a single PUT carrying the last one.
+_pending: dict[tuple[str, str], tuple[Any, list[asyncio.Future]]] = {}
+# Keys with a PUT outstanding.  Newer values for them wait in _pending
+# until it completes, so two PUTs for one key never race and Homebridge
+# always ends on the latest value.
+_inflight: set[tuple[str, str]] = set()
+_flush_handle: asyncio.TimerHandle | None = None
+
+
+def _schedule_flush(client: httpx.AsyncClient) -> None:
+    global _flush_handle
+    if _flush_handle is None and any(k not in _inflight for k in _pending):
+        _flush_handle = asyncio.get_running_loop().call_later(
+            settings.LIGHT_BATCH_WINDOW_MS / 1000, _flush, client
+        )
+
+
+async def _send_pending(
+    client: httpx.AsyncClient,
+    batch: dict[tuple[str, str], tuple[Any, list[asyncio.Future]]],
+) -> None:
+    sem = asyncio.Semaphore(max(1, settings.LIGHT_BATCH_CONCURRENCY))
+
+    async def _one(uid: str, char: str, value: Any, waiters: list[asyncio.Future]):
+        try:
+            async with sem:
+                await _authed_put(
+                    client,
+                    f"/api/accessories/{uid}",
+                    {"characteristicType": char, "value": value},
+                )
+            err = None
+        except Exception as e:
+            log.warning("Failed to set %s.%s to %s: %s", uid, char, value, e)
+            err = str(e)
+        finally:
+            _inflight.discard((uid, char))
+        for fut in waiters:
+            if not fut.done():
+                fut.set_result(err)
+        # A newer value arrived while this PUT was out; send it next
+        if (uid, char) in _pending:
+            _schedule_flush(client)
+
+    await asyncio.gather(
+        *(_one(uid, char, value, waiters) for (uid, char), (value, waiters) in batch.items())
+    )
+
+
+def _flush(client: httpx.AsyncClient) -> None:
+    global _flush_handle
+    _flush_handle = None
+    batch = {k: v for k, v in _pending.items() if k not in _inflight}
+    for key in batch:
+        del _pending[key]
+        _inflight.add(key)
+    if batch:
+        asyncio.create_task(_send_pending(client, batch))
+
+
+async def write_characteristics(
+    client: httpx.AsyncClient, ops: list[tuple[str, str, Any]]
+) -> dict:
+    """Queue (uniqueId, characteristic, value) writes and wait for them.
+
+    Writes to the same accessory + characteristic within
+    LIGHT_BATCH_WINDOW_MS are coalesced to the latest value; the batch is
+    then sent with at most LIGHT_BATCH_CONCURRENCY requests in flight.
+    While a key's PUT is outstanding, newer values keep coalescing and the
+    latest is sent once it completes.
+
+    Returns {success_ids, failed_ids, errors, coalesced, timestamp}.
+    """
+    loop = asyncio.get_running_loop()
+    waits: list[tuple[str, str, asyncio.Future]] = []
+    coalesced = 0
+    for uid, char, value in ops:
+        fut = loop.create_future()
+        prev = _pending.get((uid, char))
+        if prev is not None:
+            coalesced += 1
+        waiters = prev[1] if prev is not None else []
+        waiters.append(fut)
+        _pending[(uid, char)] = (value, waiters)
+        waits.append((uid, char, fut))
+
+    _schedule_flush(client)
+
+    success_ids: list[str] = []
+    failed_ids: list[str] = []
+    errors: list[dict] = []
+    reported: set[tuple[str, str]] = set()
+    for uid, char, fut in waits:
+        err = await fut
+        if err is None:
+            if uid not in success_ids:
+                success_ids.append(uid)
+        else:
+            if uid not in failed_ids:
+                failed_ids.append(uid)
+            # Coalesced ops share one PUT, hence one error
+            if (uid, char) not in reported:
+                reported.add((uid, char))
+                errors.append({"uniqueId": uid, "characteristic": char, "error": err})
+    return {
+        "success_ids": [u for u in success_ids if u not in failed_ids],
+        "failed_ids": failed_ids,
+        "errors": errors,
+        "coalesced": coalesced,
+        "timestamp": time.time(),
+    }
@@ -1,13 +1,15 @@
-"""Network health checks: router ping, internet ping, DNS resolve."""
+"""Network health checks: router ping, internet ping, DNS resolvers."""
 from __future__ import annotations
 
 import asyncio
+import ipaddress
 import logging
 import re
-import socket
-import time
+import secrets
+from urllib.parse import urlparse
 
 from app.config import settings
+from app.services import dns
 
 log = logging.getLogger(__name__)
 
@@ -33,21 +35,83 @@ async def _ping(host: str, timeout: int = 2) -> dict:
         return {"up": False, "latency_ms": None}
 
 
-async def _dns_check(host: str) -> dict:
-    """Resolve a hostname via the system resolver and measure latency."""
-    loop = asyncio.get_running_loop()
-    start = time.monotonic()
-    try:
-        results = await asyncio.wait_for(
-            loop.getaddrinfo(host, None, family=socket.AF_INET),
-            timeout=3.0,
+def _resolvers() -> list[tuple[str, str]]:
+    """Return (label, ip) pairs to probe.
+
+    DNS_RESOLVERS wins when set; otherwise Pi-hole (from PIHOLE_URL), the
+    router, and the first public ping target.
+    """
+    if settings.DNS_RESOLVERS:
+        return [("configured", ip) for ip in settings.DNS_RESOLVERS]
+
+    pihole_host = urlparse(settings.PIHOLE_URL).hostname or ""
+    if pihole_host == "localhost":
+        pihole_host = "127.0.0.1"
+    public = settings.PING_TARGETS[0] if settings.PING_TARGETS else "1.1.1.1"
+    out: list[tuple[str, str]] = []
+    for label, host in (
+        ("pihole", pihole_host),
+        ("router", settings.ROUTER_IP),
+        ("public", public),
+    ):
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            log.warning("DNS probe: %s resolver %r is not an IP, skipping", label, host)
+            continue
+        if host not in (ip for _, ip in out):
+            out.append((label, host))
+    return out
+
+
+async def _probe_domain(server: str, domain: str) -> dict:
+    """Query *domain* twice: the repeat shows the resolver's cache-hit time."""
+    timeout = settings.DNS_QUERY_TIMEOUT
+    first = await dns.query(server, domain, timeout=timeout)
+    repeat = None
+    if first["rcode"] is not None:
+        repeat = await dns.query(server, domain, timeout=timeout)
+    return {
+        "domain": domain,
+        "ok": first["ok"],
+        "rcode": first["rcode"],
+        "resolved_ip": first["addresses"][0] if first["addresses"] else None,
+        "ttl": first["ttl"],
+        "latency_ms": first["latency_ms"],
+        "cached_latency_ms": repeat["latency_ms"] if repeat else None,
+        "error": first["error"],
+    }
+
+
+async def _probe_resolver(label: str, server: str, domains: list[str]) -> dict:
+    """Probe one resolver for every test domain plus one cache-miss name."""
+    # A random label can't be cached, so this times the full upstream path
+    cold_name = f"sp-{secrets.token_hex(6)}.{domains[0]}"
+    *results, cold = await asyncio.gather(
+        *(_probe_domain(server, d) for d in domains),
+        dns.query(server, cold_name, timeout=settings.DNS_QUERY_TIMEOUT),
+    )
+    ok = any(r["ok"] for r in results)
+    if not ok:
+        log.warning("DNS resolver %s (%s) failed: %s", server, label, results[0]["error"] or results[0]["rcode"])
+    return {
+        "resolver": server,
+        "label": label,
+        "ok": ok,
+        "domains": results,
+        "uncached_rcode": cold["rcode"],
+        "uncached_latency_ms": cold["latency_ms"],
+    }
+
+
+async def check_dns() -> list[dict]:
+    """Probe every resolver concurrently."""
+    domains = settings.DNS_TEST_DOMAINS
+    return list(
+        await asyncio.gather(
+            *(_probe_resolver(label, ip, domains) for label, ip in _resolvers())
         )
-        latency = (time.monotonic() - start) * 1000
-        resolved_ip = results[0][4][0] if results else None
-        return {"ok": True, "resolved_ip": resolved_ip, "latency_ms": round(latency, 1)}
-    except Exception as e:
-        log.warning("DNS check %s failed: %s", host, e)
-        return {"ok": False, "resolved_ip": None, "latency_ms": None}
+    )
 
 
 async def check_all() -> dict:
@@ -55,13 +119,27 @@ async def check_all() -> dict:
     # Use first configured ping target
     ping_target = settings.PING_TARGETS[0] if settings.PING_TARGETS else "1.1.1.1"
 
-    router, internet, dns = await asyncio.gather(
+    router, internet, resolvers = await asyncio.gather(
         _ping(settings.ROUTER_IP),
         _ping(ping_target),
-        _dns_check(settings.DNS_TEST_DOMAIN),
+        check_dns(),
     )
+
+    # Summary from the primary resolver (Pi-hole by default)
+    if resolvers:
+        primary = resolvers[0]["domains"][0]
+        dns_summary = {
+            "ok": primary["ok"],
+            "resolved_ip": primary["resolved_ip"],
+            "latency_ms": primary["latency_ms"],
+            "resolver": resolvers[0]["resolver"],
+        }
+    else:
+        dns_summary = {"ok": False, "resolved_ip": None, "latency_ms": None, "resolver": None}
+
     return {
         "router": router,
         "internet_ping": {**internet, "target": ping_target},
-        "dns": dns,
+        "dns": dns_summary,
+        "dns_resolvers": resolvers,
     }
@@ -0,0 +1,175 @@
+"""Local sunrise/sunset/civil twilight for WEATHER_LAT/WEATHER_LON/TZ.
+
+Uses the NOAA general solar position equations (accurate to ~1 minute
+outside polar latitudes).  The whole year is computed in one pass into a
+flat ``array('h')`` — 4 shorts per day, minutes from UTC midnight — so a
+lookup is an index plus a timezone conversion, with no network involved.
+Tables are kept per year (a few at most, so 31 December can look up
+"tomorrow" without evicting today) and dropped when the coordinates change.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+# Columns per day, in order
+EVENTS = ("civil_dawn", "sunrise", "sunset", "civil_dusk")
+# Sun never crosses the given zenith that day (polar day/night)
+_ALWAYS_DOWN = -32768
+_ALWAYS_UP = 32767
+_ZENITH_OFFICIAL = math.radians(90.833)
+_ZENITH_CIVIL = math.radians(96.0)
+# Open-Meteo vs local disagreement that suggests bad LAT/LON/TZ
+_MISMATCH_MINUTES = 5
+
+# Enough for yesterday/today/tomorrow across a year boundary
+_MAX_TABLES = 3
+
+_tables: dict[int, array] = {}
+_location: tuple[float, float] | None = None
+
+
+def _build(year: int, lat: float, lon: float) -> array:
+    days = 366 if date(year, 12, 31).timetuple().tm_yday == 366 else 365
+    phi = math.radians(lat)
+    out = array("h", [_ALWAYS_DOWN]) * (366 * len(EVENTS))
+    for doy in range(1, days + 1):
+        g = 2 * math.pi / days * (doy - 1)
+        eqtime = 229.18 * (
+            0.000075
+            + 0.001868 * math.cos(g)
+            - 0.032077 * math.sin(g)
+            - 0.014615 * math.cos(2 * g)
+            - 0.040849 * math.sin(2 * g)
+        )
+        decl = (
+            0.006918
+            - 0.399912 * math.cos(g)
+            + 0.070257 * math.sin(g)
+            - 0.006758 * math.cos(2 * g)
+            + 0.000907 * math.sin(2 * g)
+            - 0.002697 * math.cos(3 * g)
+            + 0.00148 * math.sin(3 * g)
+        )
+        noon = 720 - 4 * lon - eqtime
+        base = (doy - 1) * len(EVENTS)
+        for col, zenith, sign in (
+            (0, _ZENITH_CIVIL, -1),
+            (1, _ZENITH_OFFICIAL, -1),
+            (2, _ZENITH_OFFICIAL, 1),
+            (3, _ZENITH_CIVIL, 1),
+        ):
+            cos_ha = math.cos(zenith) / (math.cos(phi) * math.cos(decl)) - math.tan(phi) * math.tan(decl)
+            if cos_ha < -1.0:
+                out[base + col] = _ALWAYS_UP
+            elif cos_ha <= 1.0:
+                ha = math.degrees(math.acos(cos_ha))
+                out[base + col] = round(noon + sign * 4 * ha)
+    return out
+
+
+def table(year: int | None = None) -> array:
+    """The yearly table for the configured location (built on demand)."""
+    global _location
+    year = year or datetime.now(ZoneInfo(settings.TZ)).year
+    location = (float(settings.WEATHER_LAT), float(settings.WEATHER_LON))
+    if location != _location:
+        _tables.clear()
+        _location = location
+    tbl = _tables.get(year)
+    if tbl is None:
+        if len(_tables) >= _MAX_TABLES:
+            # Evict the year furthest from the one requested
+            del _tables[max(_tables, key=lambda y: abs(y - year))]
+        tbl = _tables[year] = _build(year, *location)
+        log.info("Sun table built for %s (lat=%s lon=%s)", year, *location)
+    return tbl
+
+
+def _row(day: date) -> array:
+    base = (day.timetuple().tm_yday - 1) * len(EVENTS)
+    return table(day.year)[base : base + len(EVENTS)]
+
+
+def sun_times(day: date | None = None) -> dict[str, str | None]:
+    """Local ISO times (``YYYY-MM-DDTHH:MM``, Open-Meteo's format) for *day*.
+
+    An event that doesn't happen that day (polar day/night) is None.
+    """
+    tz = ZoneInfo(settings.TZ)
+    day = day or datetime.now(tz).date()
+    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    out: dict[str, str | None] = {}
+    for name, minutes in zip(EVENTS, _row(day)):
+        if minutes in (_ALWAYS_DOWN, _ALWAYS_UP):
+            out[name] = None
+        else:
+            local = (midnight + timedelta(minutes=minutes)).astimezone(tz)
+            out[name] = local.strftime("%Y-%m-%dT%H:%M")
+    return out
+
+
+def is_daylight(now: datetime | None = None) -> bool:
+    """True between sunrise and sunset — for time-based automations."""
+    tz = ZoneInfo(settings.TZ)
+    now = (now or datetime.now(tz)).astimezone(tz)
+    today = sun_times(now.date())
+    if today["sunrise"] is None or today["sunset"] is None:
+        return _row(now.date())[1] == _ALWAYS_UP
+    stamp = now.strftime("%Y-%m-%dT%H:%M")
+    return today["sunrise"] <= stamp < today["sunset"]
+
+
+def _minutes_apart(a: str | None, b: str | None) -> float | None:
+    if not a or not b:
+        return None
+    try:
+        delta = datetime.fromisoformat(a) - datetime.fromisoformat(b)
+    except ValueError:
+        return None
+    return round(delta.total_seconds() / 60, 1)
+
+
+def check_against(api_sunrise: str | None, api_sunset: str | None) -> dict:
+    """Compare Open-Meteo's times with the local table for the same day."""
+    if not api_sunrise:
+        return {"sunrise_diff_min": None, "sunset_diff_min": None}
+    local = sun_times(date.fromisoformat(api_sunrise[:10]))
+    result = {
+        "sunrise_diff_min": _minutes_apart(local["sunrise"], api_sunrise),
+        "sunset_diff_min": _minutes_apart(local["sunset"], api_sunset),
+    }
+    worst = max((abs(v) for v in result.values() if v is not None), default=0)
+    if worst > _MISMATCH_MINUTES:
+        log.warning(
+            "Local sun times differ from Open-Meteo by %.0f min — check LAT/LON/TZ",
+            worst,
+        )
+    return result
+
+
+def with_local_sun(entry: dict) -> dict:
+    """Cache view for /api/weather/today.
+
+    Adds civil twilight, and fills sunrise/sunset locally whenever the
+    cached weather is missing them or is from an earlier day (API down).
+    """
+    local = sun_times()
+    data = dict(entry.get("data") or {})
+    today = (local["sunrise"] or local["civil_dawn"] or "")[:10]
+    if not data.get("sunrise") or data["sunrise"][:10] != today:
+        data["sunrise"] = local["sunrise"]
+        data["sunset"] = local["sunset"]
+        data["sun_source"] = "local"
+    else:
+        data.setdefault("sun_source", "open-meteo")
+    data["civil_dawn"] = local["civil_dawn"]
+    data["civil_dusk"] = local["civil_dusk"]
+    return {**entry, "data": data}
@@ -6,6 +6,7 @@ import logging
 import httpx
 
 from app.config import settings
+from app.services import sun
 
 log = logging.getLogger(__name__)
 
@@ -39,6 +40,8 @@ async def fetch_today(client: httpx.AsyncClient) -> dict:
     daily = data.get("daily", {})
     current = data.get("current", {})
 
+    sunrise = daily.get("sunrise", [None])[0]
+    sunset = daily.get("sunset", [None])[0]
     return {
         "current_temp_f": c_to_f(current.get("temperature_2m")),
         "high_f": c_to_f(daily.get("temperature_2m_max", [None])[0]),
@@ -46,6 +49,8 @@ async def fetch_today(client: httpx.AsyncClient) -> dict:
         "precip_probability": daily.get(
             "precipitation_probability_max", [None]
         )[0],
-        "sunrise": daily.get("sunrise", [None])[0],
-        "sunset": daily.get("sunset", [None])[0],
+        "sunrise": sunrise,
+        "sunset": sunset,
+        # Local table minus Open-Meteo, in minutes
+        "sun_check": sun.check_against(sunrise, sunset),
     }
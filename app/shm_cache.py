@@ -0,0 +1,256 @@
+"""Shared-memory cache for multi-worker deployments.
+
+One refresher process (``python -m app.refresher``) owns the refresh
+loops and publishes each ``CacheEntry`` as JSON into a fixed slot of a
+memory-mapped file (``/dev/shm`` by default).  Any number of uvicorn
+workers map the same file and read from it.
+
+File layout::
+
+    header   64 bytes   magic, slot count, slot size
+    slot[i]  slot_size  seq:u64  length:u32  pad:u32  key:32s  payload
+
+Each slot is a seqlock: a writer bumps ``seq`` to an odd value, writes
+the payload, then bumps it to the next even value.  Readers never lock —
+they compare ``seq`` with the one they last decoded and only re-parse
+JSON when it moved, so the hot path is an 8-byte read plus unpickling a
+private copy (callers may mutate what ``get`` returns, as with ``Cache``).  Writers (the
+refresher, plus the occasional post-toggle re-sync in a worker)
+serialise on ``flock``.
+"""
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import time
+from typing import Any
+
+from app.cache import CacheEntry
+
+log = logging.getLogger(__name__)
+
+_MAGIC = b"SPCACHE1"
+_FILE_HEADER = struct.Struct("<8sII")
+_FILE_HEADER_SIZE = 64
+_SLOT_HEADER = struct.Struct("<QII32s")
+_SEQ = struct.Struct("<Q")
+_LEN = struct.Struct("<I")
+_READ_RETRIES = 8
+
+
+class SharedCache:
+    """Drop-in replacement for ``Cache`` backed by a shared mmap file."""
+
+    def __init__(self, path: str, *, slots: int = 16, slot_size: int = 65536) -> None:
+        if slot_size <= _SLOT_HEADER.size:
+            raise ValueError("SHM_SLOT_SIZE is too small")
+        self._path = path
+        self._slots = slots
+        self._slot_size = slot_size
+        self._fd: int | None = None
+        self._mm: mmap.mmap | None = None
+        # key -> slot index; keys never move once allocated
+        self._index: dict[str, int] = {}
+        # slot index -> (seq, pickled entry) for the last successful read;
+        # unpickling a fresh copy is ~3x cheaper than re-parsing the JSON
+        self._decoded: dict[int, tuple[int, bytes]] = {}
+
+    # ---- Mapping ---------------------------------------------------------
+
+    @property
+    def _size(self) -> int:
+        return _FILE_HEADER_SIZE + self._slots * self._slot_size
+
+    def create(self) -> None:
+        """Create (or adopt) the backing file.  Called by the refresher.
+
+        An existing file with a matching layout is kept as-is, so entries
+        survive a refresher restart and workers keep serving them.
+        """
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, _FILE_HEADER.size, 0)
+            expected = _FILE_HEADER.pack(_MAGIC, self._slots, self._slot_size)
+            if header != expected:
+                if header:
+                    log.info("Shared cache layout changed; reinitialising %s", self._path)
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, expected, 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._attach(fd)
+
+    def _ensure_open(self) -> bool:
+        if self._mm is not None:
+            return True
+        try:
+            fd = os.open(self._path, os.O_RDWR)
+        except FileNotFoundError:
+            return False
+        header = os.pread(fd, _FILE_HEADER.size, 0)
+        if header != _FILE_HEADER.pack(_MAGIC, self._slots, self._slot_size):
+            # Refresher hasn't initialised it yet, or config disagrees
+            os.close(fd)
+            return False
+        self._attach(fd)
+        return True
+
+    def _attach(self, fd: int) -> None:
+        self._fd = fd
+        self._mm = mmap.mmap(fd, self._size)
+        log.info("Shared cache mapped at %s (%d slots)", self._path, self._slots)
+
+    def _offset(self, idx: int) -> int:
+        return _FILE_HEADER_SIZE + idx * self._slot_size
+
+    # ---- Slot access -----------------------------------------------------
+
+    def _find(self, key: str) -> int | None:
+        idx = self._index.get(key)
+        if idx is not None:
+            return idx
+        want = key.encode()
+        for i in range(self._slots):
+            seq, _, _, raw_key = _SLOT_HEADER.unpack_from(self._mm, self._offset(i))
+            if seq and raw_key.rstrip(b"\0") == want:
+                self._index[key] = i
+                return i
+        return None
+
+    def _read_slot(self, idx: int) -> dict[str, Any] | None:
+        off = self._offset(idx)
+        cached = self._decoded.get(idx)
+        for _ in range(_READ_RETRIES):
+            seq1 = _SEQ.unpack_from(self._mm, off)[0]
+            if seq1 == 0:
+                return None
+            if cached is not None and cached[0] == seq1:
+                return pickle.loads(cached[1])
+            if seq1 & 1:
+                continue  # write in progress
+            length = _LEN.unpack_from(self._mm, off + 8)[0]
+            start = off + _SLOT_HEADER.size
+            payload = self._mm[start:start + length]
+            if _SEQ.unpack_from(self._mm, off)[0] != seq1:
+                continue
+            entry = json.loads(payload)
+            self._decoded[idx] = (seq1, pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+            return entry
+        # Persistent contention: serve the last good copy rather than spin
+        return pickle.loads(cached[1]) if cached is not None else None
+
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        payload = entry.model_dump_json().encode()
+        capacity = self._slot_size - _SLOT_HEADER.size
+        if len(payload) > capacity:
+            raise ValueError(
+                f"Cache entry {key!r} is {len(payload)} bytes; "
+                f"SHM_SLOT_SIZE allows {capacity}"
+            )
+        raw_key = key.encode()
+        if len(raw_key) > 32:
+            raise ValueError(f"Cache key {key!r} longer than 32 bytes")
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            idx = self._find(key)
+            if idx is None:
+                idx = self._allocate(raw_key)
+            off = self._offset(idx)
+            seq = _SEQ.unpack_from(self._mm, off)[0]
+            _SEQ.pack_into(self._mm, off, seq + 1)
+            _LEN.pack_into(self._mm, off + 8, len(payload))
+            start = off + _SLOT_HEADER.size
+            self._mm[start:start + len(payload)] = payload
+            _SEQ.pack_into(self._mm, off, seq + 2)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _allocate(self, raw_key: bytes) -> int:
+        for i in range(self._slots):
+            off = self._offset(i)
+            if _SEQ.unpack_from(self._mm, off)[0] == 0:
+                # Key is written before seq leaves 0, so readers never see
+                # a half-written name.
+                self._mm[off + 16:off + 48] = raw_key.ljust(32, b"\0")
+                self._index[raw_key.decode()] = i
+                return i
+        raise ValueError("Shared cache is full; raise SHM_SLOTS")
+
+    def _read(self, key: str) -> dict[str, Any] | None:
+        if not self._ensure_open():
+            return None
+        idx = self._find(key)
+        if idx is None:
+            return None
+        return self._read_slot(idx)
+
+    def _entries(self) -> dict[str, dict[str, Any]]:
+        if not self._ensure_open():
+            return {}
+        out: dict[str, dict[str, Any]] = {}
+        for i in range(self._slots):
+            seq, _, _, raw_key = _SLOT_HEADER.unpack_from(self._mm, self._offset(i))
+            if not seq:
+                continue
+            entry = self._read_slot(i)
+            if entry is not None:
+                out[raw_key.rstrip(b"\0").decode()] = entry
+        return out
+
+    # ---- Cache interface -------------------------------------------------
+
+    def get(self, key: str) -> dict[str, Any]:
+        entry = self._read(key)
+        if entry is None:
+            return CacheEntry(error="not yet fetched").model_dump()
+        return entry
+
+    def set(self, key: str, data: Any) -> None:
+        if not self._ensure_open():
+            log.debug("Shared cache not initialised; dropping %s", key)
+            return
+        self._write(key, CacheEntry(data=data, updated_at=time.time(), error=None))
+
+    def replace_data(self, key: str, data: Any) -> None:
+        """Swap in *data*, keeping updated_at and error (optimistic patches)."""
+        if not self._ensure_open():
+            return
+        current = self._read(key)
+        if current is None:
+            return
+        try:
+            self._write(key, CacheEntry(**{**current, "data": data}))
+        except ValueError as e:  # patched payload outgrew the slot
+            log.warning("Shared cache: can't patch %s: %s", key, e)
+
+    def set_error(self, key: str, error: str) -> None:
+        if not self._ensure_open():
+            return
+        current = self._read(key)
+        entry = CacheEntry(**current) if current is not None else CacheEntry()
+        entry.error = error
+        try:
+            self._write(key, entry)
+        except ValueError as e:
+            # Full file / bad key: called from refresh_loop's except
+            # handler, so raising here would end the refresh job for good
+            log.warning("Shared cache: can't record error for %s: %s", key, e)
+
+    def keys(self) -> list[str]:
+        return list(self._entries().keys())
+
+    def timestamps(self) -> dict[str, float | None]:
+        """Return {key: updated_at} for every cached service."""
+        return {k: v.get("updated_at") for k, v in self._entries().items()}
+
+    def errors(self) -> dict[str, str | None]:
+        """Return {key: error} for every cached service."""
+        return {k: v.get("error") for k, v in self._entries().items()}
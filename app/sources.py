@@ -0,0 +1,133 @@
+"""Data-source registry.
+
+Every cached service is declared once here.  The scheduler builds one
+refresh job per enabled source, ``app.routes.sources`` builds its
+``GET`` route, and sources listed in SOURCES_DISABLED are neither
+imported nor scheduled.
+
+Adding a source = a service module with a fetcher + one ``Source`` entry.
+"""
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+
+from app.config import settings
+
+KB = 1024
+
+
+@dataclass(frozen=True)
+class Source:
+    key: str
+    # "module:function"; imported only when the source is enabled
+    fetcher: str
+    interval: int
+    timeout: float = 5.0
+    initial_delay: float = 0.0
+    # Upper bound on the JSON-encoded payload; larger results are rejected
+    # and the previous data is kept
+    max_bytes: int = 16 * KB
+    # Fetcher takes the shared httpx.AsyncClient as its only argument
+    needs_client: bool = True
+    # GET path serving the cached entry
+    path: str = ""
+    # Optional module exposing an extra ``router`` (write endpoints etc.)
+    routes: str | None = None
+    # Settings the fetcher reads; a change on reload restarts this job
+    depends: tuple[str, ...] = ()
+    # Optional "module:function" applied to the cached entry on each GET
+    view: str | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.key not in settings.SOURCES_DISABLED
+
+    def load_fetcher(self):
+        return _load(self.fetcher)
+
+    def load_view(self):
+        return _load(self.view) if self.view else None
+
+
+def _load(target: str):
+    module, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def all_sources() -> list[Source]:
+    """Every known source, with intervals read from current settings."""
+    return [
+        Source(
+            key="lights",
+            fetcher="app.services.homebridge:fetch_accessories",
+            interval=settings.REFRESH_LIGHTS,
+            max_bytes=56 * KB,
+            path="/api/lights",
+            routes="app.routes.lights",
+            depends=(
+                "HOMEBRIDGE_URL",
+                "HOMEBRIDGE_USERNAME",
+                "HOMEBRIDGE_PASSWORD",
+                "LIGHT_IDS",
+                "LIGHT_CONFIG_PATH",
+            ),
+        ),
+        Source(
+            key="pihole",
+            fetcher="app.services.pihole:fetch_status",
+            interval=settings.REFRESH_PIHOLE,
+            initial_delay=1,
+            max_bytes=4 * KB,
+            path="/api/pihole",
+            depends=("PIHOLE_URL", "PIHOLE_API_TOKEN"),
+        ),
+        Source(
+            key="network",
+            fetcher="app.services.network:check_all",
+            interval=settings.REFRESH_NETWORK,
+            timeout=8.0,
+            initial_delay=2,
+            needs_client=False,
+            path="/api/network",
+            depends=(
+                "ROUTER_IP",
+                "PING_TARGETS",
+                "DNS_TEST_DOMAINS",
+                "DNS_RESOLVERS",
+                "DNS_QUERY_TIMEOUT",
+            ),
+        ),
+        Source(
+            key="weather",
+            fetcher="app.services.weather:fetch_today",
+            interval=settings.REFRESH_WEATHER,
+            timeout=10.0,
+            initial_delay=3,
+            max_bytes=4 * KB,
+            path="/api/weather/today",
+            depends=("WEATHER_LAT", "WEATHER_LON", "TZ"),
+            view="app.services.sun:with_local_sun",
+        ),
+        Source(
+            key="todos",
+            fetcher="app.services.todos:read_todos",
+            interval=settings.REFRESH_TODOS,
+            max_bytes=32 * KB,
+            needs_client=False,
+            path="/api/todos",
+            depends=("TODOS_FILE_PATH",),
+        ),
+        Source(
+            key="fitness",
+            fetcher="app.services.fitness:fetch_summary",
+            interval=settings.REFRESH_FITNESS,
+            needs_client=False,
+            max_bytes=4 * KB,
+            path="/api/fitness",
+        ),
+    ]
+
+
+def enabled_sources() -> list[Source]:
+    return [s for s in all_sources() if s.enabled]
@@ -0,0 +1,119 @@
+// SmartPanel starter dashboard. First paint uses the snapshot inlined into
+// index.html as window.__SMARTPANEL__; afterwards it polls the cached API.
+//
+// The API key lives in localStorage and is only ever sent as X-API-KEY.
+// Set it once by opening /#key=<key> (fragments never reach the server or
+// its logs) or by answering the prompt after a 401.
+(function () {
+  "use strict";
+
+  var KEY_STORE = "smartpanel.key";
+  var apiKey = localStorage.getItem(KEY_STORE) || "";
+  var fragment = new URLSearchParams(location.hash.slice(1));
+  if (fragment.get("key")) {
+    saveKey(fragment.get("key"));
+    history.replaceState(null, "", location.pathname);
+  }
+  var POLL_MS = 15000;
+  var ENDPOINTS = {
+    weather: "/api/weather/today",
+    lights: "/api/lights",
+    pihole: "/api/pihole",
+    network: "/api/network",
+    todos: "/api/todos",
+  };
+
+  function el(tag, cls, text) {
+    var n = document.createElement(tag);
+    if (cls) n.className = cls;
+    if (text !== undefined && text !== null) n.textContent = text;
+    return n;
+  }
+
+  function row(label, value) {
+    var r = el("div", "row");
+    r.appendChild(el("span", "dim", label));
+    r.appendChild(el("span", "", value));
+    return r;
+  }
+
+  function saveKey(key) {
+    apiKey = key;
+    localStorage.setItem(KEY_STORE, key);
+    // HttpOnly cookie so the next page load gets the inlined snapshot
+    fetch("/api/session", { method: "POST", headers: { "X-API-KEY": key } });
+  }
+
+  var prompted = false;
+
+  function api(path, opts) {
+    opts = opts || {};
+    opts.headers = Object.assign({ "X-API-KEY": apiKey }, opts.headers || {});
+    return fetch(path, opts).then(function (r) {
+      if (r.status === 401 && !prompted) {
+        prompted = true;
+        var key = window.prompt("SmartPanel API key");
+        if (key) saveKey(key);
+      }
+      return r.json();
+    });
+  }
+
+  var render = {
+    weather: function (d, body) {
+      body.appendChild(el("div", "big", d.current_temp_f != null ? Math.round(d.current_temp_f) + "°" : "–"));
+      body.appendChild(row("High / Low", (d.high_f ?? "–") + " / " + (d.low_f ?? "–")));
+      body.appendChild(row("Rain", (d.precip_probability ?? "–") + "%"));
+      body.appendChild(row("Sunset", (d.sunset || "").slice(11, 16)));
+    },
+    lights: function (d, body) {
+      d.forEach(function (l) {
+        var b = el("button", "light" + (l.on ? " on" : ""));
+        b.appendChild(el("span", "", l.name));
+        b.appendChild(el("span", "", l.on ? (l.brightness != null ? l.brightness + "%" : "On") : "Off"));
+        b.onclick = function () {
+          api("/api/lights/batch", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify([{ uniqueId: l.uniqueId, On: !l.on }]),
+          }).then(function () { refresh("lights"); });
+        };
+        body.appendChild(b);
+      });
+    },
+    pihole: function (d, body) {
+      body.appendChild(el("div", "big", (d.percent_blocked || 0).toFixed(1) + "%"));
+      body.appendChild(row("Blocked", d.blocked_today + " / " + d.queries_today));
+      body.appendChild(row("Status", d.status));
+    },
+    network: function (d, body) {
+      body.appendChild(row("Router", d.router.up ? d.router.latency_ms + " ms" : "down"));
+      body.appendChild(row("Internet", d.internet_ping.up ? d.internet_ping.latency_ms + " ms" : "down"));
+      body.appendChild(row("DNS", d.dns.ok ? d.dns.latency_ms + " ms" : "failing"));
+    },
+    todos: function (d, body) {
+      d.items.forEach(function (t) { body.appendChild(el("div", t.checked ? "done" : "", t.text)); });
+    },
+  };
+
+  function paint(key, entry) {
+    var tile = document.getElementById(key);
+    if (!tile || !entry) return;
+    var body = tile.querySelector(".body");
+    tile.classList.toggle("stale", !!entry.error);
+    if (entry.data == null) return;
+    body.textContent = "";
+    try { render[key](entry.data, body); } catch (e) { body.textContent = "–"; }
+  }
+
+  function refresh(key) {
+    return api(ENDPOINTS[key]).then(function (entry) { paint(key, entry); }, function () {});
+  }
+
+  var snapshot = window.__SMARTPANEL__ || {};
+  Object.keys(ENDPOINTS).forEach(function (key) {
+    if (snapshot[key]) paint(key, snapshot[key]);
+    else refresh(key);
+  });
+  setInterval(function () { Object.keys(ENDPOINTS).forEach(refresh); }, POLL_MS);
+})();